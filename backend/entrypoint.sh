@@ -1,18 +1,12 @@
 #!/bin/sh
+set -e
 
-echo "Waiting for database..."
-while ! nc -z db 5432; do
-    sleep 1
-done
-echo "Database is ready!"
+# Start of the cold-start budget reported by gunicorn (see gunicorn.conf.py)
+export CONTAINER_STARTED_AT=$(date +%s.%N)
 
-echo "Criando as migracoes..."
-# Create migrations
-python manage.py makemigrations
+# Waits for the database, then applies pending migrations under an advisory
+# lock; migrations are created in development and reviewed, never here
+python manage.py apply_migrations
 
-echo "Aplicando as migracoes..."
-# Apply migrations
-python manage.py migrate
-
-# Start server
-gunicorn contas_backend.wsgi:application --bind 0.0.0.0:8000
\ No newline at end of file
+# Start server (SERVER_MODE=asgi for uvicorn workers, see gunicorn.conf.py)
+exec gunicorn --config gunicorn.conf.py
@@ -3,14 +3,37 @@ ASGI config for contas_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Static files are answered by WhiteNoise before the request reaches Django,
+so the middleware chain stays async end to end (WhiteNoise's own middleware
+is sync-only and is left out of ``MIDDLEWARE`` when ``SERVER_MODE=asgi``).
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
 
 import os
 
+from asgiref.wsgi import WsgiToAsgi
+from django.conf import settings
 from django.core.asgi import get_asgi_application
+from whitenoise import WhiteNoise
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'contas_backend.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+
+def static_not_found(environ, start_response):
+    start_response('404 Not Found', [('Content-Type', 'text/plain')])
+    return [b'Not Found']
+
+
+static_application = WsgiToAsgi(WhiteNoise(
+    static_not_found, root=settings.STATIC_ROOT, prefix=settings.STATIC_URL, autorefresh=settings.DEBUG,
+))
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and scope['path'].startswith(settings.STATIC_URL):
+        return await static_application(scope, receive, send)
+    return await django_application(scope, receive, send)
@@ -43,13 +43,17 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
+    'rest_framework.authtoken',
     'corsheaders',
     'expenses',
 ]
 
 # Ensure CORS middleware is correctly placed in the middleware stack
 MIDDLEWARE = [
+    'expenses.middleware.RequestMetricsMiddleware',  # Outermost, so it times everything below
+    'expenses.log.LogContextMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # Ensure this is the first middleware
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Add this line
@@ -81,6 +85,18 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'contas_backend.wsgi.application'
 
+# 'asgi' when served by uvicorn workers (see gunicorn.conf.py): the hot read
+# endpoints then switch to async views
+SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi')
+if SERVER_MODE == 'asgi':
+    # WhiteNoise's middleware is sync-only and would make Django run the whole
+    # chain through a thread; contas_backend.asgi serves static files instead
+    MIDDLEWARE.remove('whitenoise.middleware.WhiteNoiseMiddleware')
+
+# Threads (each with its own DB connection) the async views use to run
+# independent queries concurrently, per worker
+ASYNC_QUERY_THREADS = int(os.environ.get('ASYNC_QUERY_THREADS', 4))
+
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
@@ -92,6 +108,34 @@ DATABASES = {
     )
 }
 
+# Read replicas: comma-separated URLs, added as replica_0, replica_1, ...
+# Safe requests to the expense and report endpoints read from them; a user
+# who just wrote reads from the primary for REPLICA_PIN_SECONDS. Pointing
+# a replica URL at the primary database is enough to try this locally.
+DATABASE_REPLICAS = []
+for _index, _url in enumerate(filter(None, os.environ.get('DATABASE_REPLICA_URLS', '').split(','))):
+    _alias = f'replica_{_index}'
+    DATABASES[_alias] = dj_database_url.parse(_url.strip(), conn_max_age=600)
+    DATABASES[_alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(_alias)
+
+DATABASE_ROUTERS = ['expenses.db_routers.ReplicaRouter']
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 10))
+
+
+# Cache
+# Local memory is per process: point CACHES at a shared backend (Redis,
+# Memcached or the database cache) before running more than one worker.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'contas'),
+    }
+}
+
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = 300
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -175,12 +219,25 @@ CORS_ALLOW_HEADERS = [
 # Rest Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        'expenses.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.BasicAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'UNAUTHENTICATED_USER': None,
+    # orjson instead of the stdlib encoder; clients may also ask for MessagePack
+    'DEFAULT_RENDERER_CLASSES': [
+        'expenses.renderers.ORJSONRenderer',
+        'expenses.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'expenses.renderers.ORJSONParser',
+        'expenses.renderers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 # Session settings (only for admin interface)
@@ -198,6 +255,69 @@ CSRF_TRUSTED_ORIGINS = [
     "http://127.0.0.1:3000",
 ]
 
+# In-process cache of validated API tokens
+AUTH_TOKEN_CACHE_SIZE = int(os.environ.get('AUTH_TOKEN_CACHE_SIZE', 1024))
+AUTH_TOKEN_CACHE_TTL = int(os.environ.get('AUTH_TOKEN_CACHE_TTL', 300))
+
+# Months of recurring/installment occurrences materialized ahead for forecasts
+OCCURRENCE_HORIZON_MONTHS = int(os.environ.get('OCCURRENCE_HORIZON_MONTHS', 24))
+
+# Delta sync: cursor lag behind the oldest in-flight write transaction
+# (absorbs clock skew on PostgreSQL; elsewhere, the longest a transaction
+# may take to commit), and how long deletions are remembered before
+# clients are told to resync from scratch
+SYNC_SAFETY_SECONDS = 5
+SYNC_TOMBSTONE_RETENTION_DAYS = 90
+
+# Paid one-time expenses and one-time incomes older than this many months
+# are moved to the archive tables by the archive_transactions command
+ARCHIVE_AFTER_MONTHS = int(os.environ.get('ARCHIVE_AFTER_MONTHS', 24))
+
+# Largest request the bulk endpoints accept: items to create or update, ids
+# to delete or mark paid
+BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', 1000))
+
+# Statement import: [{'pattern': 'UBER|99POP', 'category': 'Transporte'}, ...]
+IMPORT_CATEGORY_RULES = []
+
+# Request instrumentation: log requests slower than this (ms, 0 disables) with
+# their SQL, and require 'Authorization: Bearer <token>' on /metrics when set
+SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS', 0))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Seconds a new replica may take from container start to serving; gunicorn
+# logs the measured time against it and check_cold_start enforces it
+COLD_START_BUDGET_SECONDS = float(os.environ.get('COLD_START_BUDGET_SECONDS', 5))
+
+# Logging: JSON lines written by a background listener thread. Info/debug
+# lines are kept for this fraction of requests, per URL name, e.g.
+# {'expense-list': 0.05, 'summary': 0.05}; warnings and errors always are.
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+LOG_DEFAULT_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', 1.0))
+LOG_SAMPLE_RATES = {}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'request_context': {'()': 'expenses.log.RequestContextFilter'},
+    },
+    'handlers': {
+        'background': {
+            '()': 'expenses.log.BackgroundHandler',
+            'filters': ['request_context'],
+        },
+    },
+    'root': {
+        'handlers': ['background'],
+        'level': LOG_LEVEL,
+    },
+    'loggers': {
+        # Django's default handlers would write synchronously; route through the queue instead
+        'django': {'handlers': ['background'], 'level': LOG_LEVEL, 'propagate': False},
+    },
+}
+
 # Disable built-in login popups for API endpoints
 LOGIN_URL = None
 LOGIN_REDIRECT_URL = None
@@ -72,6 +72,17 @@ function App() {
     }
   };
 
+  // Expenses, incomes and categories in one request; also proves the stored credentials
+  const fetchInitialData = async () => {
+    const data = await api.getInitialData();
+    setExpenses(Array.isArray(data.expenses) ? data.expenses : []);
+    setIncomes(Array.isArray(data.incomes) ? data.incomes : []);
+    setCategories(Array.isArray(data.categories) ? data.categories : []);
+    if (!data.expenses || !data.incomes || !data.categories) {
+      setError('Erro ao carregar dados');
+    }
+  };
+
   // Check authentication status on mount
   useEffect(() => {
     const checkAuth = async () => {
@@ -80,9 +91,8 @@ function App() {
         return;
       }
       try {
-        await api.checkAuth();
+        await fetchInitialData();
         setAuthenticated(true);
-        await Promise.all([fetchExpenses(), fetchIncomes(), fetchCategories()]);
       } catch (error) {
         console.error('Authentication check failed:', error);
         setAuthenticated(false);
@@ -100,7 +110,7 @@ function App() {
       setLoading(true);
       await api.login(username, password);
       setAuthenticated(true);
-      await Promise.all([fetchExpenses(), fetchIncomes(), fetchCategories()]);
+      await fetchInitialData();
       setError(null);
     } catch (error) {
       console.error('Login failed:', error);
@@ -18,7 +18,7 @@ import {
   TableHead,
   TableRow,
 } from '@mui/material';
-import { format, addMonths, startOfMonth, endOfMonth, isWithinInterval, parseISO, isSameMonth } from 'date-fns';
+import { format, parseISO } from 'date-fns';
 import { ptBR } from 'date-fns/locale';
 import AccountBalanceIcon from '@mui/icons-material/AccountBalance';
 import BalanceIcon from '@mui/icons-material/Balance';
@@ -30,6 +30,7 @@ import CategoryIcon from '@mui/icons-material/Category';
 import ScheduleIcon from '@mui/icons-material/Schedule';
 import TrendingUpIcon from '@mui/icons-material/TrendingUp';
 import TimelineIcon from '@mui/icons-material/Timeline';
+import { getSummary, getForecast } from '../services/api';
 
 const DashboardCard = ({ title, value, icon, color }) => (
   <Card>
@@ -65,173 +66,45 @@ const Dashboard = ({ expenses, incomes, categories }) => {
     monthlyForecasts: [],
   });
 
-  const calculateMonthlyForecast = (baseDate, expenses, incomes) => {
-    const forecast = {
-      month: format(baseDate, 'MMMM yyyy', { locale: ptBR }),
-      expectedExpenses: 0,
-      expectedIncomes: 0,
-      projectedBalance: 0,
-      details: {
-        recurring: [],
-        installments: [],
-        oneTime: []
-      }
-    };
-
-    const monthStart = startOfMonth(baseDate);
-    const monthEnd = endOfMonth(baseDate);
-    const currentMonth = startOfMonth(new Date());
-
-    expenses.forEach(expense => {
-      if (expense.expense_type === 'RECURRING' && expense.paid) {
-        if (!isSameMonth(monthStart, currentMonth)) {
-          expense = { ...expense, paid: false };
-        }
-      }
-
-      if (expense.paid) return;
-
-      switch (expense.expense_type) {
-        case 'RECURRING':
-          if (expense.next_due_date) {
-            const nextDue = parseISO(expense.next_due_date);
-            if (isWithinInterval(monthStart, { start: currentMonth, end: nextDue })) {
-              forecast.expectedExpenses += parseFloat(expense.amount);
-              forecast.details.recurring.push({
-                description: expense.description,
-                amount: expense.amount,
-                date: expense.next_due_date
-              });
-            }
-          }
-          break;
-        case 'INSTALLMENT':
-          if (!expense.paid && expense.current_installment && expense.total_installments) {
-            const currentInstallment = parseInt(expense.current_installment);
-            const totalInstallments = parseInt(expense.total_installments);
-            const startDate = parseISO(expense.date);
-            const installmentDate = addMonths(startDate, currentInstallment - 1);
-            if (isSameMonth(installmentDate, baseDate) && currentInstallment <= totalInstallments) {
-              forecast.expectedExpenses += parseFloat(expense.installment_value);
-              forecast.details.installments.push({
-                description: expense.description,
-                amount: expense.installment_value,
-                installment: `${currentInstallment}/${totalInstallments}`
-              });
-            }
-          }
-          break;
-        case 'ONETIME':
-          const expenseDate = parseISO(expense.date);
-          if (isWithinInterval(expenseDate, { start: monthStart, end: monthEnd })) {
-            forecast.expectedExpenses += parseFloat(expense.amount);
-            forecast.details.oneTime.push({
-              description: expense.description,
-              amount: expense.amount,
-              date: expense.date
-            });
-          }
-          break;
-      }
-    });
-
-    incomes.forEach(income => {
-      if (income.income_type === 'RECURRING') {
-        const startDate = parseISO(income.date);
-        if (startDate <= monthEnd) {
-          forecast.expectedIncomes += parseFloat(income.amount);
-        }
-      } else {
-        const incomeDate = parseISO(income.date);
-        if (isWithinInterval(incomeDate, { start: monthStart, end: monthEnd })) {
-          forecast.expectedIncomes += parseFloat(income.amount);
-        }
-      }
-    });
-
-    forecast.projectedBalance = forecast.expectedIncomes - forecast.expectedExpenses;
-    return forecast;
-  };
-
   useEffect(() => {
     if (!Array.isArray(expenses) || !Array.isArray(incomes)) return;
 
-    const now = new Date();
-    const totalExpenses = expenses.reduce((sum, exp) => sum + parseFloat(exp.amount), 0);
-    const totalIncomes = incomes.reduce((sum, inc) => sum + parseFloat(inc.amount), 0);
-    const balance = totalIncomes - totalExpenses;
-
-    const unpaidExpenses = expenses
-      .filter(exp => !exp.paid)
-      .reduce((sum, exp) => sum + parseFloat(exp.amount), 0);
-
-    const paidExpenses = expenses
-      .filter(exp => exp.paid)
-      .reduce((sum, exp) => sum + parseFloat(exp.amount), 0);
-
-    const pendingExpenses = expenses
-      .filter(exp => !exp.paid && new Date(exp.date) < now)
-      .reduce((sum, exp) => sum + parseFloat(exp.amount), 0);
-
-    const upcomingExpenses = expenses
-      .filter(exp => {
-        const thirtyDaysFromNow = new Date();
-        thirtyDaysFromNow.setDate(thirtyDaysFromNow.getDate() + 30);
-        
-        if (exp.expense_type === 'RECURRING' && exp.next_due_date) {
-          const nextDueDate = new Date(exp.next_due_date);
-          return nextDueDate > now && nextDueDate <= thirtyDaysFromNow;
-        } else {
-          const expDate = new Date(exp.date);
-          return expDate > now && expDate <= thirtyDaysFromNow;
-        }
-      })
-      .reduce((sum, exp) => sum + parseFloat(exp.amount), 0);
-
-    const recentExpenses = [...expenses]
-      .sort((a, b) => new Date(b.date) - new Date(a.date))
-      .slice(0, 5);
-
-    const recentIncomes = [...incomes]
-      .sort((a, b) => new Date(b.date) - new Date(a.date))
-      .slice(0, 5);
-
-    const expensesByCategory = categories.map(cat => ({
-      name: cat.name,
-      total: expenses
-        .filter(exp => exp.category === cat.id)
-        .reduce((sum, exp) => sum + parseFloat(exp.amount), 0)
-    }));
+    const loadDashboard = async () => {
+      let summary;
+      let forecasts;
+      try {
+        [summary, forecasts] = await Promise.all([getSummary(), getForecast(forecastMonths)]);
+      } catch (error) {
+        console.error('Erro ao carregar resumo:', error);
+        return;
+      }
 
-    const incomesByCategory = categories.map(cat => ({
-      name: cat.name,
-      total: incomes
-        .filter(inc => inc.category === cat.id)
-        .reduce((sum, inc) => sum + parseFloat(inc.amount), 0)
-    }));
+      const monthlyForecasts = forecasts.map(forecast => ({
+        month: format(parseISO(forecast.month), 'MMMM yyyy', { locale: ptBR }),
+        expectedExpenses: parseFloat(forecast.expected_expenses),
+        expectedIncomes: parseFloat(forecast.expected_incomes),
+        projectedBalance: parseFloat(forecast.projected_balance),
+        details: forecast.details
+      }));
 
-    const monthlyForecasts = [];
-    for (let i = 0; i < forecastMonths; i++) {
-      const forecastDate = addMonths(now, i);
-      const forecast = calculateMonthlyForecast(forecastDate, expenses, incomes);
-      monthlyForecasts.push(forecast);
-    }
+      setDashboardData({
+        totalExpenses: parseFloat(summary.total_expenses),
+        totalIncomes: parseFloat(summary.total_incomes),
+        balance: parseFloat(summary.balance),
+        pendingExpenses: parseFloat(summary.pending_expenses),
+        upcomingExpenses: parseFloat(summary.upcoming_expenses),
+        unpaidExpenses: parseFloat(summary.unpaid_expenses),
+        paidExpenses: parseFloat(summary.paid_expenses),
+        categoriesCount: summary.categories_count,
+        recentExpenses: summary.recent_expenses,
+        recentIncomes: summary.recent_incomes,
+        expensesByCategory: summary.expenses_by_category,
+        incomesByCategory: summary.incomes_by_category,
+        monthlyForecasts
+      });
+    };
 
-    setDashboardData({
-      totalExpenses,
-      totalIncomes,
-      balance,
-      pendingExpenses,
-      upcomingExpenses,
-      unpaidExpenses,
-      paidExpenses,
-      categoriesCount: categories.length,
-      recentExpenses,
-      recentIncomes,
-      expensesByCategory,
-      incomesByCategory,
-      monthlyForecasts
-    });
+    loadDashboard();
   }, [expenses, incomes, categories, forecastMonths]);
 
   const formatCurrency = (value) => {
@@ -354,14 +227,14 @@ const Dashboard = ({ expenses, incomes, categories }) => {
                   </TableCell>
                   <TableCell>
                     <Typography variant="body2" color="text.secondary">
-                      {forecast.details.recurring.length > 0 && (
-                        `${forecast.details.recurring.length} despesa(s) recorrente(s)`
+                      {forecast.details.recurring > 0 && (
+                        `${forecast.details.recurring} despesa(s) recorrente(s)`
                       )}
-                      {forecast.details.installments.length > 0 && (
-                        `${forecast.details.recurring.length > 0 ? ', ' : ''}${forecast.details.installments.length} parcela(s)`
+                      {forecast.details.installments > 0 && (
+                        `${forecast.details.recurring > 0 ? ', ' : ''}${forecast.details.installments} parcela(s)`
                       )}
-                      {forecast.details.oneTime.length > 0 && (
-                        `${(forecast.details.recurring.length > 0 || forecast.details.installments.length > 0) ? ', ' : ''}${forecast.details.oneTime.length} despesa(s) única(s)`
+                      {forecast.details.one_time > 0 && (
+                        `${(forecast.details.recurring > 0 || forecast.details.installments > 0) ? ', ' : ''}${forecast.details.one_time} despesa(s) única(s)`
                       )}
                     </Typography>
                   </TableCell>
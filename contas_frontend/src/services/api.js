@@ -39,9 +39,8 @@ axiosInstance.interceptors.response.use(
   }
 );
 
-export const setCredentials = (username, password) => {
-  const credentials = btoa(`${username}:${password}`);
-  localStorage.setItem('credentials', `Basic ${credentials}`);
+export const setCredentials = (token) => {
+  localStorage.setItem('credentials', `Token ${token}`);
 };
 
 export const clearCredentials = () => {
@@ -54,9 +53,9 @@ export const hasStoredCredentials = () => {
 
 export const login = async (username, password) => {
   try {
-    setCredentials(username, password);
-    // Get categories as a login test
-    const response = await axiosInstance.get('/categories/');
+    clearCredentials();
+    const response = await axiosInstance.post('/auth/token/', { username, password });
+    setCredentials(response.data.token);
     console.log('Login successful:', response);
     return response;
   } catch (error) {
@@ -66,9 +65,16 @@ export const login = async (username, password) => {
   }
 };
 
-export const logout = () => {
-  clearCredentials();
-  return Promise.resolve();
+export const logout = async () => {
+  try {
+    if (hasStoredCredentials()) {
+      await axiosInstance.post('/auth/logout/');
+    }
+  } catch (error) {
+    console.error('Logout request failed:', error);
+  } finally {
+    clearCredentials();
+  }
 };
 
 export const checkAuth = async () => {
@@ -85,6 +91,28 @@ export const checkAuth = async () => {
   }
 };
 
+// Runs several GETs in one round trip; resolves to their bodies in order
+export const batchGet = async (paths) => {
+  const response = await axiosInstance.post('/batch/', paths.map(path => ({ method: 'GET', path })));
+  return response.data.map((result, index) => {
+    if (result.status >= 400) {
+      console.error(`Batch request ${paths[index]} failed:`, result.status, result.body);
+      return null;
+    }
+    return result.body;
+  });
+};
+
+export const getInitialData = async () => {
+  try {
+    const [expenses, incomes, categories] = await batchGet(['/expenses/', '/incomes/', '/categories/']);
+    return { expenses, incomes, categories };
+  } catch (error) {
+    console.error('Erro ao carregar dados iniciais:', error);
+    throw error;
+  }
+};
+
 export const getExpenses = async () => {
   try {
     const response = await axiosInstance.get('/expenses/');
@@ -202,4 +230,34 @@ export const deleteIncome = async (id) => {
     console.error('Erro ao excluir receita:', error);
     throw error;
   }
-};
\ No newline at end of file
+};
+
+export const getSummary = async () => {
+  try {
+    const response = await axiosInstance.get('/summary/');
+    return response.data;
+  } catch (error) {
+    console.error('Erro ao buscar resumo:', error);
+    throw error;
+  }
+};
+
+export const getForecast = async (months) => {
+  try {
+    const response = await axiosInstance.get('/forecast/', { params: { months } });
+    return response.data;
+  } catch (error) {
+    console.error('Erro ao buscar previsão:', error);
+    throw error;
+  }
+};
+
+export const syncChanges = async (since) => {
+  try {
+    const response = await axiosInstance.get('/sync/', { params: since ? { since } : {} });
+    return response.data;
+  } catch (error) {
+    console.error('Erro ao sincronizar dados:', error);
+    throw error;
+  }
+};
@@ -1,5 +1,9 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.core.exceptions import ValidationError
+from .admin_tools import AutocompleteFilter, CategoryActionForm, LargeTableAdmin
+from .bulk import mark_paid, recategorize
 from .models import Category, Expense, Income
+from .occurrences import EXPENSE, INCOME
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -7,25 +11,48 @@ class CategoryAdmin(admin.ModelAdmin):
     search_fields = ('name', 'description')
     ordering = ('name',)
 
+def recategorize_action(kind):
+    @admin.action(description='Mover para a categoria escolhida', permissions=['change'])
+    def recategorize_selected(modeladmin, request, queryset):
+        try:
+            category = CategoryActionForm.base_fields['category'].clean(request.POST.get('category'))
+        except ValidationError:
+            category = None
+        if category is None:
+            modeladmin.message_user(request, 'Escolha uma categoria.', messages.WARNING)
+            return
+        moved = recategorize(queryset, kind, category)
+        modeladmin.message_user(request, f'{moved} itens movidos para {category}.', messages.SUCCESS)
+    return recategorize_selected
+
+@admin.action(description='Marcar como pagas', permissions=['change'])
+def mark_selected_paid(modeladmin, request, queryset):
+    updated = mark_paid(queryset)
+    modeladmin.message_user(request, f'{updated} despesas marcadas como pagas.', messages.SUCCESS)
+
 @admin.register(Expense)
-class ExpenseAdmin(admin.ModelAdmin):
-    list_display = ('description', 'amount', 'category', 'date', 'expense_type', 'user')
-    list_filter = ('expense_type', 'category', 'date', 'user')
+class ExpenseAdmin(LargeTableAdmin):
+    list_display = ('description', 'amount', 'category', 'date', 'expense_type', 'paid', 'user')
+    list_filter = ('expense_type', 'paid', ('category', AutocompleteFilter), 'date', ('user', AutocompleteFilter))
     search_fields = ('description', 'category__name')
     ordering = ('-date',)
     date_hierarchy = 'date'
+    action_form = CategoryActionForm
+    actions = [mark_selected_paid, recategorize_action(EXPENSE)]
 
     def get_queryset(self, request):
         """Optimize query by prefetching related fields"""
         return super().get_queryset(request).select_related('category', 'user')
 
 @admin.register(Income)
-class IncomeAdmin(admin.ModelAdmin):
+class IncomeAdmin(LargeTableAdmin):
     list_display = ('description', 'amount', 'category', 'date', 'income_type', 'user')
-    list_filter = ('income_type', 'category', 'date', 'user')
+    list_filter = ('income_type', ('category', AutocompleteFilter), 'date', ('user', AutocompleteFilter))
     search_fields = ('description', 'category__name')
     ordering = ('-date',)
     date_hierarchy = 'date'
+    action_form = CategoryActionForm
+    actions = [recategorize_action(INCOME)]
 
     def get_queryset(self, request):
         """Optimize query by prefetching related fields"""
@@ -0,0 +1,113 @@
+import json
+
+from django import forms
+from django.contrib import admin
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from .models import Category
+
+
+def estimate_count(queryset):
+    """
+    PostgreSQL's estimate of ``len(queryset)``, or None on other databases.
+
+    Unfiltered querysets read ``pg_class.reltuples`` (kept up to date by
+    autovacuum/ANALYZE); filtered ones take the planner's row estimate.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            # -1 until the table has been analyzed once
+            return row[0] if row and row[0] >= 0 else None
+        sql, params = queryset.order_by().query.get_compiler(queryset.db).as_sql()
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that trusts the database's row estimate instead of ``COUNT(*)``.
+
+    Estimates under ``exact_below`` rows are replaced by an exact count, which
+    is cheap at that size and keeps short result lists precise. Pages past the
+    real end of an overestimated list are simply empty.
+    """
+    exact_below = 10000
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list)
+        if estimate is None or estimate < self.exact_below:
+            return super().count
+        return estimate
+
+
+class AutocompleteFilter(admin.FieldListFilter):
+    """
+    Foreign key filter rendered as one autocomplete box.
+
+    ``RelatedFieldListFilter`` lists every related row in the sidebar; this one
+    searches them through the admin autocomplete view, so the related model's
+    admin must define ``search_fields``.
+    """
+    template = 'admin/expenses/autocomplete_filter.html'
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.lookup_kwarg = f'{field_path}__{field.target_field.name}__exact'
+        super().__init__(field, request, params, model, model_admin, field_path)
+        self.lookup_val = self.used_parameters.get(self.lookup_kwarg)
+        self.form_field = field.formfield(widget=AutocompleteSelect(field, model_admin.admin_site), required=False)
+
+    def expected_parameters(self):
+        return [self.lookup_kwarg]
+
+    def choices(self, changelist):
+        yield {
+            'selected': self.lookup_val is not None,
+            'parameter': self.lookup_kwarg,
+            'widget': self.form_field.widget.render(
+                self.lookup_kwarg, self.lookup_val, attrs={'id': f'filter_{self.lookup_kwarg}', 'style': 'width: 100%'}
+            ),
+            'clear_url': changelist.get_query_string(remove=[self.lookup_kwarg]),
+        }
+
+
+class CategoryActionForm(ActionForm):
+    category = forms.ModelChoiceField(queryset=Category.objects.order_by('name'), required=False, label='Categoria')
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Changelist for tables with millions of rows.
+
+    Page counts come from ``EstimatedCountPaginator`` and the unfiltered total
+    is never counted, ``AutocompleteFilter`` entries in ``list_filter`` replace
+    full related lists and the date hierarchy buckets are cached (see
+    ``templatetags/expenses_admin.py``).
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    change_list_template = 'admin/expenses/large_change_list.html'
+
+    @property
+    def media(self):
+        media = super().media
+        for spec in self.list_filter:
+            if isinstance(spec, tuple) and issubclass(spec[1], AutocompleteFilter):
+                field = self.model._meta.get_field(spec[0])
+                return media + AutocompleteSelect(field, self.admin_site).media
+        return media
@@ -0,0 +1,142 @@
+import logging
+from operator import attrgetter
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework.permissions import SAFE_METHODS
+
+from .filters import parse_date_param
+from .models import ArchivedExpense, ArchivedIncome, Expense, Income, Occurrence
+from .occurrences import add_months
+from .pagination import newest_first
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+ARCHIVES = {Expense: ArchivedExpense, Income: ArchivedIncome}
+
+
+def archive_cutoff(today=None, months=None):
+    """First day of the month ``months`` (default ``ARCHIVE_AFTER_MONTHS``) before ``today``"""
+    today = today or timezone.localdate()
+    if months is None:
+        months = getattr(settings, 'ARCHIVE_AFTER_MONTHS', 24)
+    return add_months(today.replace(day=1), -months)
+
+
+def settled(model, cutoff):
+    """Rows that will never change again: paid one-time expenses and one-time incomes before ``cutoff``"""
+    if model is Expense:
+        return Expense.objects.filter(expense_type=Expense.ExpenseType.ONETIME, paid=True, date__lt=cutoff)
+    return Income.objects.filter(income_type=Income.IncomeType.ONETIME, date__lt=cutoff)
+
+
+def move_rows(model, ids):
+    """
+    Copy rows into the archive table and delete them from the hot one.
+
+    Plain SQL on purpose: the rows keep their ids, timestamps and search
+    vectors, and no delete signals fire, so there are no sync tombstones
+    and the monthly rollups (which count archived rows too) stay as they are.
+    """
+    archive = ARCHIVES[model]
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(field.column) for field in archive._meta.concrete_fields)
+    placeholders = ', '.join(['%s'] * len(ids))
+    pk = quote(model._meta.pk.column)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(archive._meta.db_table)} ({columns}) '
+            f'SELECT {columns} FROM {quote(model._meta.db_table)} WHERE {pk} IN ({placeholders})',
+            ids,
+        )
+        Occurrence.objects.filter(**{f'{model._meta.model_name}_id__in': ids}).delete()
+        cursor.execute(f'DELETE FROM {quote(model._meta.db_table)} WHERE {pk} IN ({placeholders})', ids)
+
+
+def archive_model(model, cutoff, batch_size=DEFAULT_BATCH_SIZE):
+    """Move every settled row of ``model`` older than ``cutoff``, ``batch_size`` rows per transaction"""
+    moved = 0
+    last_pk = 0
+    while True:
+        candidates = list(
+            settled(model, cutoff).filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not candidates:
+            return moved
+        last_pk = candidates[-1]
+        with transaction.atomic():
+            # Rows edited since the scan (marked unpaid, moved in time) or locked by a writer stay hot
+            ids = list(
+                settled(model, cutoff).select_for_update(skip_locked=True)
+                .filter(pk__in=candidates).values_list('pk', flat=True)
+            )
+            if ids:
+                move_rows(model, ids)
+        moved += len(ids)
+        logger.info("Archived %d %s rows up to id %s", len(ids), model._meta.model_name, last_pk)
+
+
+def run_archive(today=None, months=None, batch_size=DEFAULT_BATCH_SIZE):
+    cutoff = archive_cutoff(today, months)
+    return {
+        'cutoff': cutoff,
+        'expenses': archive_model(Expense, cutoff, batch_size),
+        'incomes': archive_model(Income, cutoff, batch_size),
+    }
+
+
+def archive_horizon(model, user):
+    """Date of the user's newest archived ``model`` row, or None when nothing is archived"""
+    return ARCHIVES[model].objects.filter(user=user).order_by('-date').values_list('date', flat=True).first()
+
+
+class ArchiveReadMixin:
+    """
+    Serve archived rows from a viewset's read endpoints when the request needs them.
+
+    One indexed lookup finds the user's newest archived date; requests whose
+    ``date_from`` is after it, and keyset pages that fill up before reaching
+    it, never touch the archive table. Otherwise the view's filters run over
+    the archive too and both row sets are merged in ``(date, id)`` order.
+    Archived rows are read-only: writes to their ids answer 404.
+    """
+
+    def get_archived_queryset(self, oldest=None):
+        """The view's filters over the archive, or None when no archived row can be on or after ``oldest``"""
+        model = self.get_serializer_class().Meta.model
+        horizon = archive_horizon(model, self.request.user)
+        if horizon is None:
+            return None
+        date_from = parse_date_param(self.request.query_params, 'date_from')
+        if (date_from and date_from > horizon) or (oldest and oldest > horizon):
+            return None
+        queryset = ARCHIVES[model].objects.filter(user=self.request.user).select_related('category')
+        return self.filter_queryset(queryset).order_by('-date', '-id')
+
+    def with_archived(self, queryset):
+        """``queryset`` (ordered newest first) plus the archived rows the request covers"""
+        archived = self.get_archived_queryset()
+        if archived is None:
+            return queryset
+        return list(newest_first(queryset, archived, key=attrgetter('date', 'pk')))
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            if self.request.method not in SAFE_METHODS:
+                raise
+        model = self.get_serializer_class().Meta.model
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        instance = get_object_or_404(
+            ARCHIVES[model].objects.filter(user=self.request.user).select_related('category'),
+            **{self.lookup_field: self.kwargs[lookup]}
+        )
+        self.check_object_permissions(self.request, instance)
+        return instance
@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .cache import (
+    GLOBAL_SCOPE, USER_SCOPE, get_cache, response_cache_key, response_validators, set_cached_data,
+    set_validator_headers,
+)
+from .db_routers import read_from_replicas, replica_reads_allowed
+from .metrics import current_stats, timed_serialization
+from .pagination import newest_first
+from .reports import assemble_summary, summary_queries
+from .serializers import compact_requested
+from .views import CategoryViewSet, ExpenseViewSet, IncomeViewSet, SummaryView
+
+logger = logging.getLogger(__name__)
+
+query_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'ASYNC_QUERY_THREADS', 4),
+    thread_name_prefix='async-query',
+)
+
+
+def _with_connection(func):
+    # Pool threads keep their own connection; retire it the way a request would
+    close_old_connections()
+    try:
+        return func()
+    finally:
+        close_old_connections()
+
+
+async def run_query(func):
+    """
+    Run a blocking ORM callable on the query pool.
+
+    Django's async ORM funnels every query through one shared thread, so
+    ``asyncio.gather`` over ``aaggregate()`` calls would still run them one
+    after another. Each pool thread has its own database connection, which
+    lets independent queries actually overlap.
+    """
+    return await sync_to_async(_with_connection, thread_sensitive=False, executor=query_executor)(func)
+
+
+async def build_summary_concurrently(user, today=None):
+    today = today or timezone.localdate()
+    queries = summary_queries(user, today)
+    results = await asyncio.gather(*(run_query(query) for query in queries.values()))
+    return assemble_summary(dict(zip(queries, results)))
+
+
+def serialize_rows(view, rows):
+    """The view's serializer data for ``rows``, plus the label table in compact mode"""
+    with timed_serialization():
+        data = view.get_serializer(rows, many=True).data
+    labels = view.get_serializer_class().label_table(rows) if compact_requested(view.request) else None
+    return data, labels
+
+
+async def list_rows(viewset_class, request):
+    """
+    Run a viewset's list action with the async ORM, reusing its filters, paginator and serializer.
+
+    Serialization is CPU-bound and, for unpaginated lists, as long as the
+    user's history, so it runs on the query pool instead of the event loop.
+    """
+    view = viewset_class(request=request, format_kwarg=None, action='list', args=(), kwargs={})
+    queryset = view.filter_queryset(view.get_queryset())
+    paginator = view.paginator
+    if paginator is not None:
+        page = await paginator.apaginate_queryset(queryset, request, view=view)
+        if page is not None:
+            data, labels = await run_query(lambda: serialize_rows(view, page))
+            data = paginator.get_paginated_response(data).data
+            if labels is not None:
+                data['labels'] = labels
+            return data
+    rows = [row async for row in queryset]
+    get_archived = getattr(view, 'get_archived_queryset', None)
+    archived = await sync_to_async(get_archived)() if get_archived else None
+    if archived is not None:
+        rows = list(newest_first(rows, [row async for row in archived]))
+    data, labels = await run_query(lambda: serialize_rows(view, rows))
+    if labels is not None:
+        return {'labels': labels, 'results': data}
+    return data
+
+
+def select_renderer(request):
+    """Negotiate among the configured renderers, skipping the browsable API"""
+    renderers = [renderer() for renderer in api_settings.DEFAULT_RENDERER_CLASSES if renderer.format != 'api']
+    try:
+        renderer, _ = api_settings.DEFAULT_CONTENT_NEGOTIATION_CLASS().select_renderer(request, renderers)
+        return renderer
+    except exceptions.NotAcceptable:
+        return renderers[0]
+
+
+def render(data, request, status_code=status.HTTP_200_OK, headers=None):
+    renderer = select_renderer(request)
+    start = time.perf_counter()
+    content = renderer.render(data)
+    stats = current_stats.get()
+    if stats is not None:
+        stats.add_render_time(time.perf_counter() - start)
+    response = HttpResponse(content, status=status_code, content_type=renderer.media_type)
+    for name, value in (headers or {}).items():
+        response[name] = value
+    return response
+
+
+def render_exception(exc, request):
+    data = exc.detail if isinstance(exc.detail, (dict, list)) else {'detail': exc.detail}
+    headers = {}
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        authenticators = request.authenticators
+        if authenticators:
+            headers['WWW-Authenticate'] = authenticators[0].authenticate_header(request)
+    return render(data, request, exc.status_code, headers)
+
+
+def async_read_view(read, sync_view, scope=USER_SCOPE, name='data'):
+    """
+    Serve GET with the coroutine ``read(request)`` and any other method with ``sync_view``.
+
+    GETs authenticate with the configured DRF authenticators and share the
+    response cache and ETags of ``expenses.cache.cached_response``, so sync
+    and async workers answer the same request identically. Like
+    ``ReplicaRoutingMixin``, they read from replicas unless the user is pinned.
+    """
+    delegate = sync_to_async(sync_view)
+
+    async def view(request, *args, **kwargs):
+        if request.method != 'GET':
+            return await delegate(request, *args, **kwargs)
+
+        drf_request = Request(
+            request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+        )
+        try:
+            user = await run_query(lambda: drf_request.user)
+            if not user or not user.is_authenticated:
+                raise exceptions.NotAuthenticated()
+
+            digest, etag, last_modified = response_validators(request, user, scope)
+            if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+                response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                data = get_cache().get(response_cache_key(digest))
+                if data is None:
+                    logger.info("User %s requesting %s (async)", user.pk, name)
+                    token = read_from_replicas.set(replica_reads_allowed(user.pk))
+                    try:
+                        data = await read(drf_request)
+                    finally:
+                        read_from_replicas.reset(token)
+                    set_cached_data(digest, data)
+                response = render(data, drf_request)
+            return set_validator_headers(response, etag, last_modified)
+        except exceptions.APIException as exc:
+            return render_exception(exc, drf_request)
+        except Exception as e:
+            logger.error("Error in async %s view: %s", name, e, exc_info=True)
+            return render({"error": f"Error fetching {name}"}, drf_request, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    view.csrf_exempt = True
+    view.sync_view = sync_view
+    return view
+
+
+expense_list = async_read_view(
+    lambda request: list_rows(ExpenseViewSet, request),
+    ExpenseViewSet.as_view({'get': 'list', 'post': 'create'}),
+    name='expenses',
+)
+income_list = async_read_view(
+    lambda request: list_rows(IncomeViewSet, request),
+    IncomeViewSet.as_view({'get': 'list', 'post': 'create'}),
+    name='incomes',
+)
+category_list = async_read_view(
+    lambda request: list_rows(CategoryViewSet, request),
+    CategoryViewSet.as_view({'get': 'list', 'post': 'create'}),
+    scope=GLOBAL_SCOPE,
+    name='categories',
+)
+summary = async_read_view(
+    lambda request: build_summary_concurrently(request.user),
+    SummaryView.as_view(),
+    name='summary',
+)
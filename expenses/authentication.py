@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework.authentication import TokenAuthentication
+
+from .cache import get_cache
+
+
+class TokenCache:
+    """Thread-safe LRU of validated tokens with a time-to-live per entry"""
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def evict(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def evict_user(self, user_id):
+        with self._lock:
+            stale = [key for key, (_, (_, user, _)) in self._entries.items() if user.pk == user_id]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache(
+    maxsize=getattr(settings, 'AUTH_TOKEN_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'AUTH_TOKEN_CACHE_TTL', 300),
+)
+
+
+def _auth_version_key(user_id):
+    return f'expenses:auth-version:{user_id}'
+
+
+def auth_version(user_id):
+    return get_cache().get(_auth_version_key(user_id), 0)
+
+
+def revoke_user_tokens(user_id):
+    """
+    Drop the user's validated tokens from every process's ``token_cache``.
+
+    The local entries go now; the other processes see the bumped version in
+    the shared cache on their next hit. The bump waits for the commit, like
+    ``expenses.cache.bump_version``: earlier, a concurrent request could
+    revalidate against the old rows and cache them under the new version.
+    """
+    def bump():
+        token_cache.evict_user(user_id)
+        get_cache().set(_auth_version_key(user_id), time.time_ns(), None)
+
+    token_cache.evict_user(user_id)
+    transaction.on_commit(bump)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that remembers validated tokens in process.
+
+    A cache hit costs a dictionary lookup and one read of the user's auth
+    version from the shared cache instead of a database query, and unlike
+    Basic authentication no password hash is ever computed per request.
+    Deleting a token or saving its user bumps that version (see
+    ``expenses.signals``), which every process checks, and entries expire
+    after ``AUTH_TOKEN_CACHE_TTL`` regardless. With a per-process cache
+    backend (locmem) only the revoking process notices, and the TTL is the
+    revocation window for the others.
+    """
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            version, user, token = cached
+            if version == auth_version(user.pk):
+                return user, token
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, (auth_version(user.pk), user, token))
+        return user, token
@@ -0,0 +1,142 @@
+import logging
+import random
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from django.core.cache.backends.db import DatabaseCache
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .cache import get_cache
+from .db_routers import pinned_database, replica_aliases, replica_reads_allowed
+
+logger = logging.getLogger(__name__)
+
+BATCH_MAX_REQUESTS = 20
+
+
+def cache_writes_to(alias):
+    """Whether the response cache stores its entries in database ``alias``"""
+    cache = get_cache()
+    return isinstance(cache, DatabaseCache) and router.db_for_write(cache.cache_model_class) == alias
+
+
+@contextmanager
+def read_snapshot(alias):
+    """
+    Run the block in one read-only transaction on ``alias``.
+
+    On PostgreSQL the transaction is REPEATABLE READ, so every query sees the
+    same snapshot; other databases only get the transaction. Reads are pinned
+    to ``alias`` either way. When the response cache keeps its entries in
+    ``alias``, cached responses and data versions are written there, so the
+    block runs without the transaction instead.
+    """
+    connection = connections[alias]
+    token = pinned_database.set(alias)
+    try:
+        if cache_writes_to(alias):
+            yield
+            return
+        snapshot = connection.vendor == 'postgresql' and not connection.in_atomic_block
+        with transaction.atomic(using=alias):
+            if snapshot:
+                with connection.cursor() as cursor:
+                    cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY')
+            yield
+    finally:
+        pinned_database.reset(token)
+
+
+class BatchView(APIView):
+    """
+    ``POST batch/`` runs several GET requests to this API in one round trip.
+
+    The body lists the sub-requests, e.g. ``[{"path": "/api/expenses/"},
+    {"path": "categories/?page_size=50"}]``; paths may omit the API prefix.
+    The batch authenticates once and its sub-requests run in order on one
+    database snapshot (see ``read_snapshot``). The response holds ``{"status",
+    "body"}`` per sub-request, in input order; a failing sub-request, even
+    one that raises, doesn't fail the batch.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response({"error": "Envie uma lista não vazia de requisições."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > BATCH_MAX_REQUESTS:
+            return Response(
+                {"error": f"No máximo {BATCH_MAX_REQUESTS} requisições por lote."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        prefix = request.path[:-len('batch/')]
+        alias = DEFAULT_DB_ALIAS
+        if replica_reads_allowed(request.user.pk):
+            alias = random.choice(replica_aliases())
+
+        results = []
+        with read_snapshot(alias):
+            for item in items:
+                try:
+                    # A savepoint each, so one failing sub-request leaves the others' transaction usable
+                    with transaction.atomic(using=alias):
+                        results.append(self.run(request, item, prefix))
+                except Exception:
+                    logger.exception("Batch sub-request failed for user %s", request.user.pk)
+                    results.append(self.error(status.HTTP_500_INTERNAL_SERVER_ERROR, "Erro interno do servidor."))
+
+        logger.info("User %s ran a batch of %d requests", request.user.pk, len(items))
+        return Response(results)
+
+    def run(self, request, item, prefix):
+        if not isinstance(item, dict) or not isinstance(item.get('path'), str):
+            return self.error(status.HTTP_400_BAD_REQUEST, "Informe o caminho (path) da requisição.")
+        if str(item.get('method', 'GET')).upper() != 'GET':
+            return self.error(status.HTTP_405_METHOD_NOT_ALLOWED, "Apenas requisições GET são aceitas em lote.")
+
+        url = urlsplit(item['path'])
+        path = url.path.lstrip('/')
+        if path.startswith(prefix.lstrip('/')):
+            path = path[len(prefix.lstrip('/')):]
+        try:
+            match = resolve('/' + path, urlconf='expenses.urls')
+        except Resolver404:
+            return self.error(status.HTTP_404_NOT_FOUND, "Caminho não encontrado.")
+        if match.url_name == 'batch':
+            return self.error(status.HTTP_400_BAD_REQUEST, "Lotes não podem ser aninhados.")
+
+        sub_request = self.subrequest(request, prefix + path, url.query)
+        sub_request.resolver_match = match
+        # Async GET handlers (ASGI mode) keep their DRF view around for other callers
+        view = getattr(match.func, 'sync_view', match.func)
+        response = view(sub_request, *match.args, **match.kwargs)
+        if response.streaming or not hasattr(response, 'data'):
+            return self.error(status.HTTP_400_BAD_REQUEST, "Esta rota não pode ser usada em lote.")
+        return {"status": response.status_code, "body": response.data}
+
+    @staticmethod
+    def subrequest(request, path, query):
+        """A GET for ``path`` carrying the batch's headers and its already authenticated user"""
+        outer = request._request
+        sub_request = HttpRequest()
+        sub_request.method = 'GET'
+        sub_request.path = sub_request.path_info = path
+        # Conditional headers belong to the batch, not to its parts
+        sub_request.META = {key: value for key, value in outer.META.items() if not key.startswith('HTTP_IF_')}
+        sub_request.META.update(REQUEST_METHOD='GET', PATH_INFO=path, QUERY_STRING=query, CONTENT_LENGTH='0')
+        sub_request.GET = QueryDict(query)
+        sub_request.COOKIES = outer.COOKIES
+        sub_request._force_auth_user = request.user
+        sub_request._force_auth_token = request.auth
+        return sub_request
+
+    @staticmethod
+    def error(status_code, message):
+        return {"status": status_code, "body": {"error": message}}
@@ -0,0 +1,108 @@
+import json
+import statistics
+import time
+from dataclasses import dataclass, field
+from datetime import date
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .cache import get_cache
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: str
+    payload: dict = None
+    cold: bool = True  # drop cached responses first so the request does the real work
+    created_ids: list = field(default_factory=list)
+
+
+def default_scenarios():
+    today = date.today().isoformat()
+    return [
+        Scenario('expense_list', 'get', '/api/expenses/'),
+        Scenario('expense_page', 'get', '/api/expenses/?page_size=50'),
+        Scenario('expense_create', 'post', '/api/expenses/', payload={
+            'description': 'Benchmark', 'amount': '12.34', 'date': today, 'expense_type': 'ONETIME',
+        }),
+        Scenario('summary', 'get', '/api/summary/'),
+        Scenario('summary_cached', 'get', '/api/summary/', cold=False),
+        Scenario('expense_export', 'get', '/api/expenses/export/?output=csv'),
+    ]
+
+
+def percentile(values, pct):
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[pct - 1]
+
+
+def run_scenario(client, scenario, iterations, warmup=2):
+    """Time one scenario through the full middleware stack and return its latency and query stats"""
+    latencies = []
+    query_counts = []
+    started = time.perf_counter()
+    for index in range(warmup + iterations):
+        if scenario.cold:
+            get_cache().clear()
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            if scenario.method == 'get':
+                response = client.get(scenario.path)
+            else:
+                response = client.generic(
+                    scenario.method.upper(), scenario.path, data=json.dumps(scenario.payload or {}),
+                    content_type='application/json',
+                )
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+            elapsed = time.perf_counter() - start
+        if response.status_code >= 400:
+            raise RuntimeError(f'{scenario.name}: {scenario.path} answered {response.status_code}')
+        if scenario.method == 'post':
+            scenario.created_ids.append(response.json()['id'])
+        if index < warmup:
+            started = time.perf_counter()
+            continue
+        latencies.append(elapsed * 1000)
+        query_counts.append(len(queries))
+    total = time.perf_counter() - started
+
+    return {
+        'iterations': iterations,
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'mean_ms': round(statistics.fmean(latencies), 2),
+        'throughput_rps': round(iterations / total, 2),
+        'queries': max(query_counts),
+    }
+
+
+def compare(baseline, current, threshold, min_delta_ms=2.0):
+    """
+    List regressions of ``current`` against ``baseline`` scenario results.
+
+    Latency percentiles may grow and throughput may drop by ``threshold``
+    (a fraction) before counting as a regression; latency changes under
+    ``min_delta_ms`` are treated as noise. Query counts are deterministic,
+    so any increase is one.
+    """
+    regressions = []
+    for name, before in baseline.items():
+        after = current.get(name)
+        if after is None:
+            continue
+        for metric in ('p50_ms', 'p95_ms', 'p99_ms'):
+            slower = after[metric] - before[metric]
+            if after[metric] > before[metric] * (1 + threshold) and slower >= min_delta_ms:
+                regressions.append(f'{name}: {metric} {before[metric]} -> {after[metric]}')
+        if after['throughput_rps'] < before['throughput_rps'] / (1 + threshold):
+            regressions.append(f"{name}: throughput_rps {before['throughput_rps']} -> {after['throughput_rps']}")
+        if after['queries'] > before['queries']:
+            regressions.append(f"{name}: queries {before['queries']} -> {after['queries']}")
+    return regressions
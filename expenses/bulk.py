@@ -0,0 +1,248 @@
+import logging
+
+from django.db import transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .cache import bump_user_version
+from .models import Occurrence, transaction_key
+from .occurrences import EXPENSE, INSTALLMENT, ONETIME, RECURRING, sync_many_occurrences
+from .rollups import apply_deltas, contributions, grouped_contributions, merge
+from .serializers import BULK_MAX_ITEMS, BulkIdsSerializer, MarkPaidSerializer
+
+logger = logging.getLogger(__name__)
+
+
+def _locked(queryset):
+    """A plain queryset over the rows of ``queryset``, locked until the transaction ends"""
+    rows = queryset.model.objects.filter(pk__in=queryset.values('pk')).order_by()
+    list(rows.select_for_update().values_list('pk', flat=True))
+    return rows
+
+
+def _owners(rows):
+    return set(rows.values_list('user', flat=True).distinct())
+
+
+def _locked_ids(queryset, ids):
+    """The ``ids`` present in ``queryset``, locked until the transaction ends"""
+    return set(queryset.filter(pk__in=ids).select_for_update(of=('self',)).values_list('pk', flat=True))
+
+
+def _missing(ids, found):
+    """Requested ids that do not exist or belong to another user, in request order"""
+    return [pk for pk in dict.fromkeys(ids) if pk not in found]
+
+
+def current_occurrence():
+    """
+    Occurrences at their parent's current due date: ``next_due_date`` (or
+    ``date``) for recurring rows, the current installment for plans and the
+    only occurrence of one-time rows. Earlier occurrences are history.
+    """
+    return (
+        Q(source_type=RECURRING, due_date=Coalesce(F('expense__next_due_date'), F('expense__date')))
+        | Q(source_type=INSTALLMENT, installment_number=Coalesce(F('expense__current_installment'), Value(1)))
+        | Q(source_type=ONETIME)
+    )
+
+
+def resolve_paid_date(paid, paid_date=None):
+    """The ``paid_date`` stored with ``paid``: today by default when paying, none otherwise"""
+    if not paid:
+        return None
+    return paid_date or timezone.localdate()
+
+
+def mark_paid(queryset, paid=True, paid_date=None):
+    """
+    Set the paid flag of the expenses in ``queryset`` without loading them.
+
+    One GROUP BY computes the rollup deltas of the rows whose flag changes,
+    one UPDATE sets the flag on each expense's current occurrence and one
+    UPDATE sets the expenses, with ``resolve_paid_date(paid, paid_date)``.
+    Returns the number of expenses updated.
+    """
+    paid_date = resolve_paid_date(paid, paid_date)
+    with transaction.atomic():
+        rows = _locked(queryset)
+        owners = _owners(rows)
+        changing = rows.exclude(paid=paid)
+        deltas = merge(
+            grouped_contributions(changing, EXPENSE, sign=-1),
+            grouped_contributions(changing, EXPENSE, paid=paid),
+        )
+        Occurrence.objects.filter(current_occurrence(), expense__in=rows.values('pk')).update(paid=paid)
+        updated = rows.update(paid=paid, paid_date=paid_date, updated_at=timezone.now())
+        apply_deltas(deltas)
+    for user_id in owners:
+        bump_user_version(user_id)
+    return updated
+
+
+def recategorize(queryset, kind, category):
+    """Move the rows of ``queryset`` to ``category`` with one UPDATE; returns the number of rows moved"""
+    with transaction.atomic():
+        moved = _locked(queryset.exclude(category=category))
+        owners = _owners(moved)
+        deltas = merge(
+            grouped_contributions(moved, kind, sign=-1),
+            grouped_contributions(moved, kind, category=category.pk),
+        )
+        updated = moved.update(category=category, updated_at=timezone.now())
+        apply_deltas(deltas)
+    for user_id in owners:
+        bump_user_version(user_id)
+    return updated
+
+
+class BulkWriteMixin:
+    """
+    Set-based write endpoints for a user's transactions.
+
+    ``POST bulk/`` creates, ``PATCH bulk/`` partially updates (every item
+    carries its ``id``) and ``DELETE bulk/`` deletes by ``ids``. Each call is
+    validated with the viewset's serializer, written in a single transaction
+    and is all-or-nothing: when any item is invalid nothing is saved and the
+    response lists the errors in input order, ``{}`` for valid items.
+    """
+    occurrence_kind = None
+
+    def _bulk_items(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return None, Response(
+                {"error": "Envie uma lista não vazia de itens."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > BULK_MAX_ITEMS:
+            return None, Response(
+                {"error": f"No máximo {BULK_MAX_ITEMS} itens por requisição."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return items, None
+
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request, *args, **kwargs):
+        if request.method == 'POST':
+            return self.bulk_create(request)
+        if request.method == 'PATCH':
+            return self.bulk_update(request)
+        return self.bulk_destroy(request)
+
+    def bulk_create(self, request):
+        items, error = self._bulk_items(request)
+        if error:
+            return error
+
+        serializers = [self.get_serializer(data=item) for item in items]
+        errors = [{} if serializer.is_valid() else serializer.errors for serializer in serializers]
+        if any(errors):
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        model = self.get_queryset().model
+        instances = [model(user=request.user, **serializer.validated_data) for serializer in serializers]
+        for instance in instances:
+            instance.dedupe_key = transaction_key(instance.user_id, instance.date, instance.amount, instance.description)
+        with transaction.atomic():
+            model.objects.bulk_create(instances, batch_size=BULK_MAX_ITEMS)
+            sync_many_occurrences(instances, self.occurrence_kind)
+            apply_deltas(contributions(instances, self.occurrence_kind))
+        bump_user_version(request.user.pk)
+
+        logger.info(
+            "Bulk created %d %s for user %s", len(instances), model._meta.verbose_name_plural, request.user.pk
+        )
+        data = self.get_serializer(instances, many=True).data
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    def bulk_update(self, request):
+        items, error = self._bulk_items(request)
+        if error:
+            return error
+
+        ids = [item.get('id') for item in items if isinstance(item, dict)]
+        model = self.get_queryset().model
+        with transaction.atomic():
+            # Locked until commit, so the rollup deltas below start from the stored rows
+            instances = self.get_queryset().select_for_update(of=('self',)).in_bulk(
+                [pk for pk in ids if isinstance(pk, int)]
+            )
+
+            serializers = []
+            errors = []
+            seen = set()
+            for item in items:
+                pk = item.get('id') if isinstance(item, dict) else None
+                instance = instances.get(pk)
+                if instance is None or pk in seen:
+                    message = "Item não encontrado." if instance is None else "Item repetido na requisição."
+                    serializers.append(None)
+                    errors.append({"id": [message]})
+                    continue
+                seen.add(pk)
+                serializer = self.get_serializer(instance, data=item, partial=True)
+                serializers.append(serializer)
+                errors.append({} if serializer.is_valid() else serializer.errors)
+            if any(errors):
+                return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+            previous = contributions([serializer.instance for serializer in serializers], self.occurrence_kind, sign=-1)
+            fields = {'updated_at', 'dedupe_key'}
+            now = timezone.now()
+            updated = []
+            for serializer in serializers:
+                instance = serializer.instance
+                for field, value in serializer.validated_data.items():
+                    setattr(instance, field, value)
+                    fields.add(field)
+                instance.updated_at = now
+                instance.dedupe_key = transaction_key(
+                    instance.user_id, instance.date, instance.amount, instance.description
+                )
+                updated.append(instance)
+
+            model.objects.bulk_update(updated, sorted(fields), batch_size=BULK_MAX_ITEMS)
+            sync_many_occurrences(updated, self.occurrence_kind)
+            apply_deltas(merge(previous, contributions(updated, self.occurrence_kind)))
+        bump_user_version(request.user.pk)
+
+        logger.info(
+            "Bulk updated %d %s for user %s", len(updated), model._meta.verbose_name_plural, request.user.pk
+        )
+        return Response(self.get_serializer(updated, many=True).data)
+
+    def bulk_destroy(self, request):
+        serializer = BulkIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        model = self.get_queryset().model
+        with transaction.atomic():
+            found = _locked_ids(self.get_queryset(), ids)
+            _, per_model = model.objects.filter(pk__in=found).delete()
+        deleted = per_model.get(model._meta.label, 0)
+        logger.info("Bulk deleted %d rows for user %s", deleted, request.user.pk)
+        return Response({"deleted": deleted, "not_found": _missing(ids, found)})
+
+
+class BulkMarkPaidMixin:
+    """``PATCH bulk-mark-paid/`` flags many expenses as paid (or unpaid) through ``mark_paid``"""
+
+    @action(detail=False, methods=['patch'], url_path='bulk-mark-paid')
+    def bulk_mark_paid(self, request, *args, **kwargs):
+        serializer = MarkPaidSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        paid = serializer.validated_data['paid']
+        paid_date = resolve_paid_date(paid, serializer.validated_data.get('paid_date'))
+
+        with transaction.atomic():
+            found = _locked_ids(self.get_queryset(), ids)
+            updated = mark_paid(self.get_queryset().filter(pk__in=found), paid, paid_date)
+
+        logger.info("Marked %d rows as paid=%s for user %s", updated, paid, request.user.pk)
+        return Response({"updated": updated, "paid": paid, "paid_date": paid_date, "not_found": _missing(ids, found)})
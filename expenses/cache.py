@@ -0,0 +1,119 @@
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.response import Response
+
+GLOBAL_SCOPE = 'global'
+USER_SCOPE = 'user'
+
+
+def get_cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def _version_key(owner):
+    return f'expenses:data-version:{owner}'
+
+
+def bump_version(owner):
+    """
+    Invalidate every cached response that depends on ``owner`` (a user id or 'global').
+
+    Inside a transaction the bump waits for the commit: bumped earlier, a
+    concurrent read could see the new version with the old rows and cache
+    them under it.
+    """
+    transaction.on_commit(lambda: get_cache().set(_version_key(owner), time.time_ns(), None))
+
+
+def bump_user_version(user_id):
+    bump_version(user_id)
+
+
+def bump_global_version():
+    bump_version(GLOBAL_SCOPE)
+
+
+def get_version(owner):
+    cache = get_cache()
+    version = cache.get(_version_key(owner))
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(_version_key(owner), version, None):
+            version = cache.get(_version_key(owner), version)
+    return version
+
+
+def response_validators(request, user, scope=USER_SCOPE):
+    """Return ``(digest, etag, last_modified)`` for a read of ``request`` by ``user``"""
+    owners = [GLOBAL_SCOPE]
+    if scope == USER_SCOPE:
+        owners.append(user.pk)
+    versions = [get_version(owner) for owner in owners]
+
+    variant = '|'.join([
+        str(user.pk if scope == USER_SCOPE else ''),
+        request.build_absolute_uri(),
+        request.META.get('HTTP_ACCEPT', ''),
+        timezone.localdate().isoformat(),
+        *map(str, versions),
+    ])
+    digest = hashlib.sha256(variant.encode('utf-8')).hexdigest()
+    return digest, f'"{digest[:32]}"', http_date(max(versions) / 1e9)
+
+
+def response_cache_key(digest):
+    return f'expenses:response:{digest}'
+
+
+def set_cached_data(digest, data):
+    get_cache().set(response_cache_key(digest), data, getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300))
+
+
+def set_validator_headers(response, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = last_modified
+    response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ('Authorization', 'Accept'))
+    return response
+
+
+def cached_response(scope=USER_SCOPE):
+    """
+    Cache a GET handler's response data per data version, with ETag support.
+
+    ``scope='user'`` responses depend on the requesting user's rows and on
+    categories; ``scope='global'`` responses only on categories. The ETag is
+    derived from the versions, so ``If-None-Match`` is answered with 304
+    without touching the database, and a cache hit skips both the queries
+    and the serialization. Versions are bumped by ``expenses.signals`` and
+    by the set-based write paths.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(self, request, *args, **kwargs):
+            digest, etag, last_modified = response_validators(request, request.user, scope)
+
+            if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                data = get_cache().get(response_cache_key(digest))
+                if data is not None:
+                    response = Response(data)
+                else:
+                    response = handler(self, request, *args, **kwargs)
+                    if response.status_code != status.HTTP_200_OK:
+                        return response
+                    set_cached_data(digest, response.data)
+
+            return set_validator_headers(response, etag, last_modified)
+        return wrapper
+    return decorator
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+from django.utils.module_loading import import_string
+
+
+@register()
+def check_async_middleware(app_configs, **kwargs):
+    """Under ASGI, one sync-only middleware makes Django run the chain through threads"""
+    if settings.SERVER_MODE != 'asgi':
+        return []
+    return [
+        Warning(
+            f'{path} is sync-only, so every request is adapted through a thread.',
+            hint='Use an async-capable middleware or drop it when SERVER_MODE is asgi.',
+            id='expenses.W001',
+        )
+        for path in settings.MIDDLEWARE
+        if not getattr(import_string(path), 'async_capable', False)
+    ]
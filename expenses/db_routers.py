@@ -0,0 +1,87 @@
+import contextvars
+import random
+
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+
+from .cache import GLOBAL_SCOPE, get_cache
+
+read_from_replicas = contextvars.ContextVar('read_from_replicas', default=False)
+# Set while a request must read everything from one connection (one snapshot); wins over replica selection
+pinned_database = contextvars.ContextVar('pinned_database', default=None)
+
+
+def replica_aliases():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def _pin_key(scope):
+    return f'expenses:db-pin:{scope}'
+
+
+def pin_to_primary(*scopes):
+    """Send reads of these scopes (user ids or 'global') to the primary for ``REPLICA_PIN_SECONDS``"""
+    timeout = getattr(settings, 'REPLICA_PIN_SECONDS', 10)
+    get_cache().set_many({_pin_key(scope): True for scope in scopes}, timeout)
+
+
+def replica_reads_allowed(user_id):
+    """False while the user, or anyone changing categories, has written recently"""
+    if not replica_aliases():
+        return False
+    return not get_cache().get_many([_pin_key(user_id), _pin_key(GLOBAL_SCOPE)])
+
+
+class ReplicaRouter:
+    """
+    Send reads to a random replica while ``read_from_replicas`` is set.
+
+    Views opt in through ``ReplicaRoutingMixin``; everything else, writes and
+    migrations included, uses ``default``. ``pinned_database`` overrides both.
+    """
+
+    def db_for_read(self, model, **hints):
+        pinned = pinned_database.get()
+        if pinned is not None:
+            return pinned
+        replicas = replica_aliases()
+        if replicas and read_from_replicas.get():
+            return random.choice(replicas)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return False if db in replica_aliases() else None
+
+
+class ReplicaRoutingMixin:
+    """
+    Serve safe requests from replicas, with read-your-writes for the writer.
+
+    After authentication, GET/HEAD/OPTIONS read from a replica unless the
+    user wrote within ``REPLICA_PIN_SECONDS``; any successful write pins the
+    user (and ``pin_scopes``) to the primary for that window. Views whose
+    results feed a cursor, like delta sync, should not use this.
+    """
+    pin_scopes = ()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and replica_reads_allowed(request.user.pk):
+            self._replica_token = read_from_replicas.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            read_from_replicas.reset(token)
+            self._replica_token = None
+        user = getattr(request, 'user', None)
+        if (request.method not in SAFE_METHODS and response.status_code < 400
+                and user is not None and user.is_authenticated):
+            pin_to_primary(user.pk, *self.pin_scopes)
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,69 @@
+from datetime import date
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+
+def parse_date_param(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValidationError({name: 'Data inválida, use o formato AAAA-MM-DD.'})
+
+
+def parse_bool_param(params, name):
+    value = params.get(name)
+    if value is None or value == '':
+        return None
+    lowered = value.lower()
+    if lowered in ('true', '1', 'yes'):
+        return True
+    if lowered in ('false', '0', 'no'):
+        return False
+    raise ValidationError({name: 'Valor inválido, use true ou false.'})
+
+
+class TransactionFilterBackend(BaseFilterBackend):
+    """
+    Server-side filters shared by the expense and income list endpoints.
+
+    Supported query parameters: ``date_from``, ``date_to``, ``category``,
+    ``type`` (matched against the view's ``type_field``), ``paid`` (models
+    that track payment only) and ``search`` over the description.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        date_from = parse_date_param(params, 'date_from')
+        if date_from:
+            queryset = queryset.filter(date__gte=date_from)
+        date_to = parse_date_param(params, 'date_to')
+        if date_to:
+            queryset = queryset.filter(date__lte=date_to)
+
+        category = params.get('category')
+        if category:
+            try:
+                queryset = queryset.filter(category_id=int(category))
+            except ValueError:
+                raise ValidationError({'category': 'Categoria inválida.'})
+
+        type_field = getattr(view, 'type_field', None)
+        transaction_type = params.get('type')
+        if type_field and transaction_type:
+            queryset = queryset.filter(**{type_field: transaction_type.upper()})
+
+        if any(field.name == 'paid' for field in queryset.model._meta.get_fields()):
+            paid = parse_bool_param(params, 'paid')
+            if paid is not None:
+                queryset = queryset.filter(paid=paid)
+
+        search = params.get('search', '').strip()
+        if search:
+            queryset = queryset.filter(description__icontains=search)
+
+        return queryset
@@ -0,0 +1,280 @@
+import codecs
+import csv
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+
+from .cache import bump_user_version
+from .models import ArchivedExpense, ArchivedIncome, Category, Expense, Income, transaction_key
+from .occurrences import EXPENSE, INCOME, sync_many_occurrences
+from .rollups import apply_deltas, contributions, merge
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 20
+
+DATE_COLUMNS = ('date', 'data', 'dt', 'data lançamento', 'data lancamento')
+AMOUNT_COLUMNS = ('amount', 'valor', 'value', 'quantia')
+DESCRIPTION_COLUMNS = ('description', 'descrição', 'descricao', 'histórico', 'historico', 'memo', 'lançamento')
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d/%m/%y', '%d-%m-%Y')
+
+
+class StatementError(ValueError):
+    pass
+
+
+@dataclass
+class StatementRow:
+    line: int
+    date: date
+    amount: Decimal
+    description: str
+
+
+def parse_amount(value):
+    """Parse ``-1.234,56``, ``1234.56`` or ``R$ 12,00`` into a signed Decimal"""
+    text = re.sub(r'[^\d,.\-+]', '', value or '')
+    if ',' in text and '.' in text:
+        if text.rfind(',') > text.rfind('.'):
+            text = text.replace('.', '').replace(',', '.')
+        else:
+            text = text.replace(',', '')
+    elif ',' in text:
+        text = text.replace(',', '.')
+    try:
+        return Decimal(text).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise StatementError(f'Valor inválido: {value!r}')
+
+
+def parse_date(value, date_format=None):
+    value = (value or '').strip()
+    for candidate in ((date_format,) if date_format else DATE_FORMATS):
+        try:
+            return datetime.strptime(value, candidate).date()
+        except ValueError:
+            continue
+    raise StatementError(f'Data inválida: {value!r}')
+
+
+def _find_column(fieldnames, candidates, explicit=None):
+    if explicit:
+        if explicit not in fieldnames:
+            raise StatementError(f'Coluna {explicit!r} não encontrada no arquivo')
+        return explicit
+    lookup = {name.strip().casefold(): name for name in fieldnames if name}
+    for candidate in candidates:
+        if candidate in lookup:
+            return lookup[candidate]
+    raise StatementError(f'Nenhuma das colunas {", ".join(candidates)} foi encontrada no arquivo')
+
+
+def iter_csv_rows(stream, delimiter=None, date_column=None, amount_column=None,
+                  description_column=None, date_format=None):
+    """Yield rows from a text CSV stream one line at a time"""
+    first_line = stream.readline()
+    if not first_line:
+        return
+    if delimiter is None:
+        delimiter = ';' if first_line.count(';') > first_line.count(',') else ','
+    header = next(csv.reader([first_line], delimiter=delimiter))
+    date_column = _find_column(header, DATE_COLUMNS, date_column)
+    amount_column = _find_column(header, AMOUNT_COLUMNS, amount_column)
+    description_column = _find_column(header, DESCRIPTION_COLUMNS, description_column)
+
+    reader = csv.DictReader(stream, fieldnames=header, delimiter=delimiter)
+    for line, record in enumerate(reader, start=2):
+        # Fields beyond the header are collected as a list under the None key
+        if not any((value or '').strip() for key, value in record.items() if key is not None):
+            continue
+        try:
+            yield StatementRow(
+                line=line,
+                date=parse_date(record[date_column], date_format),
+                amount=parse_amount(record[amount_column]),
+                description=(record[description_column] or '').strip(),
+            )
+        except StatementError as e:
+            yield StatementError(f'Linha {line}: {e}')
+
+
+def _iter_ofx_tags(stream, chunk_size=64 * 1024):
+    """Tokenize SGML or XML OFX into ``(tag, text)`` pairs without loading the file"""
+    buffer = ''
+    while True:
+        chunk = stream.read(chunk_size)
+        buffer += chunk
+        parts = buffer.split('<')
+        buffer = parts.pop() if chunk else ''
+        for part in parts:
+            if not part:
+                continue
+            tag, _, text = part.partition('>')
+            yield tag.strip().upper(), text.strip()
+        if not chunk:
+            if buffer:
+                tag, _, text = buffer.partition('>')
+                yield tag.strip().upper(), text.strip()
+            return
+
+
+def iter_ofx_rows(stream):
+    """Yield one row per ``<STMTTRN>`` block of an OFX statement"""
+    current = None
+    count = 0
+    for tag, text in _iter_ofx_tags(stream):
+        if tag == 'STMTTRN':
+            current = {}
+        elif tag == '/STMTTRN' and current is not None:
+            count += 1
+            try:
+                if 'DTPOSTED' not in current or 'TRNAMT' not in current:
+                    raise StatementError('transação sem DTPOSTED ou TRNAMT')
+                yield StatementRow(
+                    line=count,
+                    date=parse_date(current['DTPOSTED'][:8], '%Y%m%d'),
+                    amount=parse_amount(current['TRNAMT']),
+                    description=current.get('MEMO') or current.get('NAME') or '',
+                )
+            except StatementError as e:
+                yield StatementError(f'Transação {count}: {e}')
+            current = None
+        elif current is not None and not tag.startswith('/') and text:
+            current[tag] = text
+
+
+def open_text(binary_stream, encoding='utf-8'):
+    """Wrap an uploaded or opened binary file for incremental text decoding"""
+    return codecs.getreader(encoding)(binary_stream, errors='replace')
+
+
+class CategoryRules:
+    """
+    Ordered ``(regex, category name)`` rules matched against descriptions.
+
+    Rules come from ``settings.IMPORT_CATEGORY_RULES`` unless given
+    explicitly; the first matching rule wins and unknown category names are
+    ignored.
+    """
+
+    def __init__(self, rules=None):
+        if rules is None:
+            rules = getattr(settings, 'IMPORT_CATEGORY_RULES', [])
+        names = {rule['category'] for rule in rules}
+        categories = {category.name: category for category in Category.objects.filter(name__in=names)}
+        self.rules = [
+            (re.compile(rule['pattern'], re.IGNORECASE), categories[rule['category']])
+            for rule in rules
+            if rule['category'] in categories
+        ]
+
+    def match(self, description):
+        for pattern, category in self.rules:
+            if pattern.search(description):
+                return category
+        return None
+
+
+class StatementImporter:
+    """
+    Insert statement rows for one user in bounded batches.
+
+    Negative amounts become expenses and positive ones incomes. Each batch
+    checks its dedupe keys against the ``(user, dedupe_key)`` indexes of the
+    live and archive tables, so rows already in the database (including
+    earlier batches of the same file) are
+    skipped while memory stays proportional to the batch size.
+    """
+
+    def __init__(self, user, rules=None, batch_size=DEFAULT_BATCH_SIZE, mark_paid=True):
+        self.user = user
+        self.rules = rules if rules is not None else CategoryRules()
+        self.batch_size = batch_size
+        self.mark_paid = mark_paid
+        self.stats = {'expenses': 0, 'incomes': 0, 'duplicates': 0, 'errors': 0, 'error_messages': []}
+
+    def run(self, rows):
+        batch = []
+        for row in rows:
+            if isinstance(row, StatementError):
+                self._record_error(row)
+                continue
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self._flush(batch)
+                batch = []
+        if batch:
+            self._flush(batch)
+        logger.info("Statement import for user %s finished: %s", self.user.pk, dict(self.stats))
+        return self.stats
+
+    def _record_error(self, error):
+        self.stats['errors'] += 1
+        if len(self.stats['error_messages']) < MAX_REPORTED_ERRORS:
+            self.stats['error_messages'].append(str(error))
+
+    def _build(self, row, key):
+        category = self.rules.match(row.description)
+        if row.amount < 0:
+            return Expense(
+                user=self.user, category=category, amount=-row.amount, description=row.description,
+                date=row.date, paid=self.mark_paid, paid_date=row.date if self.mark_paid else None,
+                dedupe_key=key,
+            )
+        return Income(
+            user=self.user, category=category, amount=row.amount, description=row.description,
+            date=row.date, dedupe_key=key,
+        )
+
+    def _flush(self, rows):
+        pending = {}
+        for row in rows:
+            if not row.description:
+                self._record_error(StatementError(f'Linha {row.line}: descrição vazia'))
+                continue
+            key = transaction_key(self.user.pk, row.date, abs(row.amount), row.description)
+            if key in pending:
+                self.stats['duplicates'] += 1
+                continue
+            pending[key] = row
+
+        existing = set(
+            Expense.objects.filter(user=self.user, dedupe_key__in=pending).values_list('dedupe_key', flat=True)
+        )
+        for model in (Income, ArchivedExpense, ArchivedIncome):
+            existing.update(
+                model.objects.filter(user=self.user, dedupe_key__in=pending).values_list('dedupe_key', flat=True)
+            )
+        self.stats['duplicates'] += len(existing)
+
+        instances = [self._build(row, key) for key, row in pending.items() if key not in existing]
+        expenses = [instance for instance in instances if isinstance(instance, Expense)]
+        incomes = [instance for instance in instances if isinstance(instance, Income)]
+        with transaction.atomic():
+            Expense.objects.bulk_create(expenses)
+            Income.objects.bulk_create(incomes)
+            sync_many_occurrences(expenses, EXPENSE)
+            sync_many_occurrences(incomes, INCOME)
+            apply_deltas(merge(contributions(expenses, EXPENSE), contributions(incomes, INCOME)))
+        if expenses or incomes:
+            bump_user_version(self.user.pk)
+        self.stats['expenses'] += len(expenses)
+        self.stats['incomes'] += len(incomes)
+
+
+def import_statement(user, binary_stream, file_format, encoding='utf-8', rules=None,
+                     batch_size=DEFAULT_BATCH_SIZE, **csv_options):
+    text = open_text(binary_stream, encoding)
+    if file_format == 'ofx':
+        rows = iter_ofx_rows(text)
+    elif file_format == 'csv':
+        rows = iter_csv_rows(text, **csv_options)
+    else:
+        raise StatementError(f'Formato não suportado: {file_format!r}')
+    return StatementImporter(user, rules=rules, batch_size=batch_size).run(rows)
@@ -0,0 +1,171 @@
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+request_context = contextvars.ContextVar('log_request_context', default=None)
+
+# Attributes every LogRecord has; anything else on a record came from ``extra``
+RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+SECRET_PATTERNS = [
+    (re.compile(r'\b(Token|Bearer|Basic)\s+[A-Za-z0-9+/=._-]+'), r'\1 [redacted]'),
+    (
+        re.compile(r'''(?i)\b(password|senha|token|secret|api_key|authorization)(["']?\s*[:=]\s*["']?)[^\s,"'&}]+'''),
+        r'\1\2[redacted]',
+    ),
+]
+SECRET_KEYS = {'password', 'senha', 'token', 'secret', 'auth', 'authorization', 'api_key'}
+
+
+def redact(text):
+    for pattern, replacement in SECRET_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; credentials are masked before anything is written"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, dt_timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': redact(record.getMessage()),
+        }
+        for key, value in vars(record).items():
+            if key in RECORD_ATTRIBUTES or key.startswith('_'):
+                continue
+            entry[key] = '[redacted]' if key.lower() in SECRET_KEYS else value
+        if record.exc_text or record.exc_info:
+            entry['exc'] = redact(record.exc_text or self.formatException(record.exc_info))
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class BackgroundHandler(QueueHandler):
+    """
+    Queue records for a ``QueueListener`` thread that formats and writes them.
+
+    The request thread only pays for a ``put_nowait``: messages stay lazy
+    (``msg`` and ``args`` are formatted on the listener thread, so pass
+    plain values as arguments) and when the queue is full records are
+    dropped instead of blocking. The listener is started per process on
+    first use, so it also works in forked gunicorn workers.
+    """
+
+    def __init__(self, stream=None, maxsize=10000):
+        super().__init__(queue.Queue(maxsize))
+        self.target = logging.StreamHandler(stream or sys.stderr)
+        self.target.setFormatter(JsonFormatter())
+        self.dropped = 0
+        self._pid = None
+        self._listener = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_listener(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # A forked child inherits a queue whose listener thread did not survive the fork
+            self.queue = queue.Queue(self.queue.maxsize)
+            self._listener = QueueListener(self.queue, self.target)
+            self._listener.start()
+            self._pid = os.getpid()
+            atexit.register(self._listener.stop)
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        if record.exc_info:
+            # Tracebacks reference live frames; render them before leaving this thread
+            record.exc_text = self.target.formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        self._ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Tag records with the current request id and endpoint, and apply sampling.
+
+    Below WARNING, records of requests that ``LogContextMiddleware`` did not
+    sample are dropped here, before they are queued.
+    """
+
+    def filter(self, record):
+        context = request_context.get()
+        if context is None:
+            return True
+        record.request_id = context['request_id']
+        record.endpoint = context['endpoint']
+        return record.levelno >= logging.WARNING or context['sampled']
+
+
+class LogContextMiddleware:
+    """
+    Give each request a log context with an id, its endpoint and a sampling decision.
+
+    The endpoint is the resolved URL name; ``LOG_SAMPLE_RATES`` maps
+    endpoints to the fraction of requests whose info/debug lines are kept,
+    defaulting to ``LOG_DEFAULT_SAMPLE_RATE``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        from django.conf import settings
+
+        self.get_response = get_response
+        self.rates = getattr(settings, 'LOG_SAMPLE_RATES', {})
+        self.default_rate = getattr(settings, 'LOG_DEFAULT_SAMPLE_RATE', 1.0)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def new_context(self):
+        return {'request_id': uuid.uuid4().hex[:16], 'endpoint': None, 'sampled': True}
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = request_context.set(self.new_context())
+        try:
+            return self.get_response(request)
+        finally:
+            request_context.reset(token)
+
+    async def __acall__(self, request):
+        token = request_context.set(self.new_context())
+        try:
+            return await self.get_response(request)
+        finally:
+            request_context.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Mutate the shared dict: this hook may run in a copied context
+        context = request_context.get()
+        if context is not None:
+            endpoint = request.resolver_match.view_name
+            context['endpoint'] = endpoint
+            context['sampled'] = random.random() < self.rates.get(endpoint, self.default_rate)
+        return None
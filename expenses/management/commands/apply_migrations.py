@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError
+
+from expenses.startup import apply_pending_migrations, wait_for_database
+
+
+class Command(BaseCommand):
+    help = (
+        'Container startup step: wait for the database, then apply pending migrations under an '
+        'advisory lock so concurrent replicas do not race. Never creates migrations.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--wait', type=float, default=60, help='Seconds to wait for the database')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        try:
+            wait_for_database(options['database'], timeout=options['wait'])
+        except OperationalError as e:
+            raise CommandError(f'Database unavailable after {options["wait"]}s: {e}')
+
+        applied = apply_pending_migrations(options['database'], verbosity=options['verbosity'])
+        elapsed = time.monotonic() - started
+        if applied:
+            self.stdout.write(self.style.SUCCESS(f'Applied {applied} migrations in {elapsed:.2f}s'))
+        else:
+            self.stdout.write(f'No migrations to apply ({elapsed:.2f}s)')
@@ -0,0 +1,32 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from expenses.archive import DEFAULT_BATCH_SIZE, run_archive
+
+
+class Command(BaseCommand):
+    help = (
+        'Move paid one-time expenses and one-time incomes older than --months (default '
+        'ARCHIVE_AFTER_MONTHS) to the archive tables, in batches. Safe to run repeatedly.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, help='Archive rows dated before this many whole months ago')
+        parser.add_argument('--date', help='Treat this day (YYYY-MM-DD) as today')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError('Data inválida, use o formato AAAA-MM-DD.')
+        if options['months'] is not None and options['months'] < 1:
+            raise CommandError('Informe ao menos 1 mês.')
+
+        results = run_archive(today=today, months=options['months'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {results['expenses']} expenses and {results['incomes']} incomes dated before {results['cutoff']}"
+        ))
@@ -0,0 +1,41 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a gunicorn master does before forking workers (see gunicorn.conf.py)
+BOOT_SCRIPT = (
+    "import os; os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'contas_backend.settings'); "
+    "from contas_backend.{module} import application; "
+    "from expenses.startup import warm_up; warm_up()"
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Time fresh interpreters loading and warming up the app, and fail when the median '
+        'exceeds COLD_START_BUDGET_SECONDS. Migrations and the database are not included.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=3)
+        parser.add_argument('--budget', type=float, help='Seconds; defaults to COLD_START_BUDGET_SECONDS')
+
+    def handle(self, *args, **options):
+        budget = options['budget'] or settings.COLD_START_BUDGET_SECONDS
+        script = BOOT_SCRIPT.format(module=settings.SERVER_MODE)
+        durations = []
+        for _ in range(max(1, options['runs'])):
+            started = time.monotonic()
+            subprocess.run([sys.executable, '-c', script], check=True, env=os.environ.copy())
+            durations.append(time.monotonic() - started)
+
+        median = statistics.median(durations)
+        summary = f"Cold start median {median:.2f}s over {len(durations)} runs (budget {budget:.1f}s)"
+        if median > budget:
+            raise CommandError(summary)
+        self.stdout.write(self.style.SUCCESS(summary))
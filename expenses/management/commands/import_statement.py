@@ -0,0 +1,52 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from expenses.importers import DEFAULT_BATCH_SIZE, CategoryRules, StatementError, import_statement
+
+
+class Command(BaseCommand):
+    help = 'Import a CSV or OFX bank statement for a user, skipping rows that already exist'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'ofx'], help='Defaults to the file extension')
+        parser.add_argument('--encoding', default='utf-8')
+        parser.add_argument('--rules', help='JSON file with [{"pattern": ..., "category": ...}] rules')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--delimiter')
+        parser.add_argument('--date-format', help='strptime format of the CSV date column')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['username']!r} does not exist")
+
+        file_format = options['format'] or options['path'].rsplit('.', 1)[-1].lower()
+        rules = None
+        if options['rules']:
+            with open(options['rules'], encoding='utf-8') as rules_file:
+                rules = CategoryRules(json.load(rules_file))
+
+        csv_options = {}
+        if file_format == 'csv':
+            csv_options = {'delimiter': options['delimiter'], 'date_format': options['date_format']}
+
+        try:
+            with open(options['path'], 'rb') as statement:
+                stats = import_statement(
+                    user, statement, file_format, encoding=options['encoding'], rules=rules,
+                    batch_size=options['batch_size'], **csv_options
+                )
+        except StatementError as e:
+            raise CommandError(str(e))
+
+        for message in stats['error_messages']:
+            self.stderr.write(message)
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {stats['expenses']} expenses and {stats['incomes']} incomes; "
+            f"skipped {stats['duplicates']} duplicates and {stats['errors']} invalid rows"
+        ))
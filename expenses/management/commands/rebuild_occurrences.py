@@ -0,0 +1,25 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from expenses.cache import bump_global_version
+from expenses.models import Expense, Income, Occurrence
+from expenses.occurrences import default_until, rebuild_occurrences
+
+
+class Command(BaseCommand):
+    help = 'Recompute materialized occurrences for recurring, installment and one-time rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', dest='users', help='Username to rebuild (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        users = None
+        if options['users']:
+            users = User.objects.filter(username__in=options['users'])
+        until = default_until()
+        created = rebuild_occurrences(
+            Expense, Income, Occurrence, until=until, users=users, batch_size=options['batch_size']
+        )
+        bump_global_version()
+        self.stdout.write(self.style.SUCCESS(f'Materialized {created} occurrences up to {until}'))
@@ -0,0 +1,49 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+
+from expenses.cache import bump_global_version
+from expenses.rollups import rebuild_for_users
+
+
+def rebuild_chunk(user_ids):
+    try:
+        return rebuild_for_users(user_ids)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Recompute or repair the monthly rollup table in parallel chunks of users'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', dest='users', help='Username to rebuild (repeatable)')
+        parser.add_argument('--chunk-size', type=int, default=200, help='Users per chunk')
+        parser.add_argument('--workers', type=int, default=4)
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('pk')
+        if options['users']:
+            users = users.filter(username__in=options['users'])
+        user_ids = list(users.values_list('pk', flat=True))
+        chunk_size = options['chunk_size']
+        chunks = [user_ids[index:index + chunk_size] for index in range(0, len(user_ids), chunk_size)]
+
+        # SQLite allows a single writer, so parallel chunks would only contend
+        workers = 1 if connection.vendor == 'sqlite' else max(1, options['workers'])
+        rows = 0
+        if workers == 1:
+            for chunk in chunks:
+                rows += rebuild_for_users(chunk)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(rebuild_chunk, chunk) for chunk in chunks]
+                for future in as_completed(futures):
+                    rows += future.result()
+
+        bump_global_version()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {rows} rollup rows for {len(user_ids)} users in {len(chunks)} chunks'
+        ))
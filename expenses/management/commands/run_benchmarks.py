@@ -0,0 +1,82 @@
+import json
+import os
+from datetime import datetime, timezone as dt_timezone
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from rest_framework.authtoken.models import Token
+
+from expenses.benchmarks import compare, default_scenarios, run_scenario
+from expenses.models import Expense
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the list, create, summary and export endpoints in process, write the results '
+        'as JSON and fail when they regress against a baseline'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', default='bench_0', help='User whose data is queried (see seed_bench_data)')
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--scenario', action='append', dest='scenarios', help='Only run this scenario')
+        parser.add_argument('--output', help='Write the results to this JSON file')
+        parser.add_argument('--baseline', help='Compare against this JSON file')
+        parser.add_argument('--threshold', type=float, default=0.25, help='Allowed slowdown, as a fraction')
+        parser.add_argument('--min-delta-ms', type=float, default=2.0, help='Ignore latency changes below this')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['user']!r} not found, run seed_bench_data first")
+        token, _ = Token.objects.get_or_create(user=user)
+        client = Client(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        scenarios = default_scenarios()
+        if options['scenarios']:
+            scenarios = [scenario for scenario in scenarios if scenario.name in options['scenarios']]
+
+        results = {}
+        try:
+            for scenario in scenarios:
+                results[scenario.name] = stats = run_scenario(client, scenario, options['iterations'], options['warmup'])
+                self.stdout.write(
+                    f"{scenario.name:<16} p50 {stats['p50_ms']:>9.2f} ms  p95 {stats['p95_ms']:>9.2f} ms  "
+                    f"p99 {stats['p99_ms']:>9.2f} ms  {stats['throughput_rps']:>8.2f} req/s  "
+                    f"{stats['queries']} queries"
+                )
+        finally:
+            created = [pk for scenario in scenarios for pk in scenario.created_ids]
+            Expense.objects.filter(pk__in=created).delete()
+
+        report = {
+            'meta': {
+                'created_at': datetime.now(dt_timezone.utc).isoformat(),
+                'database': connection.vendor,
+                'user': user.username,
+                'expenses': Expense.objects.filter(user=user).count(),
+                'iterations': options['iterations'],
+            },
+            'scenarios': results,
+        }
+        if options['output']:
+            os.makedirs(os.path.dirname(os.path.abspath(options['output'])), exist_ok=True)
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+            regressions = compare(
+                baseline['scenarios'], results, options['threshold'], options['min_delta_ms']
+            )
+            if regressions:
+                for regression in regressions:
+                    self.stderr.write(regression)
+                raise CommandError(f'{len(regressions)} benchmark regressions beyond {options["threshold"]:.0%}')
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
@@ -0,0 +1,38 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from expenses.scheduler import DEFAULT_BATCH_SIZE, run_scheduler
+
+
+class Command(BaseCommand):
+    help = (
+        'Advance next_due_date of recurring rows and current_installment of installment rows whose '
+        'due date has passed, for every user. Run it from cron or with --loop.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Treat this day (YYYY-MM-DD) as today')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--force', action='store_true', help='Rescan even if today already finished')
+        parser.add_argument('--loop', action='store_true', help='Keep running, one pass per interval')
+        parser.add_argument('--interval', type=int, default=3600, help='Seconds between passes with --loop')
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError('Data inválida, use o formato AAAA-MM-DD.')
+
+        while True:
+            results = run_scheduler(today=today, batch_size=options['batch_size'], force=options['force'])
+            summary = ', '.join(f'{name}: {count}' for name, count in results.items())
+            self.stdout.write(self.style.SUCCESS(f'Advanced rows ({summary})'))
+            if not options['loop']:
+                break
+            close_old_connections()
+            time.sleep(options['interval'])
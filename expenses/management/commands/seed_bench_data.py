@@ -0,0 +1,129 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from expenses.cache import bump_global_version
+from expenses.models import Category, Expense, Income, transaction_key
+from expenses.occurrences import EXPENSE, INCOME, add_months, sync_many_occurrences
+from expenses.rollups import rebuild_for_users
+
+BATCH_SIZE = 2000
+BENCH_PASSWORD = 'bench'
+
+CATEGORIES = [
+    ('Moradia', 'home', '#3f51b5'),
+    ('Alimentação', 'restaurant', '#ff9800'),
+    ('Transporte', 'directions_car', '#009688'),
+    ('Saúde', 'local_hospital', '#e91e63'),
+    ('Educação', 'school', '#673ab7'),
+    ('Lazer', 'sports_esports', '#8bc34a'),
+    ('Assinaturas', 'subscriptions', '#795548'),
+    ('Salário', 'work', '#4caf50'),
+    ('Freelance', 'laptop', '#00bcd4'),
+    ('Investimentos', 'trending_up', '#cddc39'),
+]
+
+EXPENSE_DESCRIPTIONS = [
+    'Supermercado', 'Padaria', 'Uber', 'Combustível', 'Farmácia', 'Restaurante', 'Cinema',
+    'Conta de luz', 'Conta de água', 'Internet', 'Aluguel', 'Academia', 'Streaming', 'Livraria',
+]
+INCOME_DESCRIPTIONS = ['Salário', 'Projeto freelance', 'Dividendos', 'Reembolso', 'Venda', 'Bônus']
+
+# Share of ONETIME / RECURRING / INSTALLMENT rows, close to what real users enter
+TYPE_WEIGHTS = (('ONETIME', 0.75), ('RECURRING', 0.15), ('INSTALLMENT', 0.10))
+
+
+class Command(BaseCommand):
+    help = 'Generate benchmark users with realistic volumes of categories, expenses and incomes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=3)
+        parser.add_argument('--expenses', type=int, default=20000, help='Expenses per user')
+        parser.add_argument('--incomes', type=int, default=2000, help='Incomes per user')
+        parser.add_argument('--months', type=int, default=36, help='How far back dates are spread')
+        parser.add_argument('--prefix', default='bench', help='Username prefix of the generated users')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--reset', action='store_true', help='Delete previously generated users first')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        prefix = options['prefix']
+        if options['reset']:
+            deleted, _ = User.objects.filter(username__startswith=f'{prefix}_').delete()
+            self.stdout.write(f'Deleted {deleted} rows from previous runs')
+
+        categories = self.ensure_categories()
+        today = timezone.localdate()
+        start = add_months(today, -options['months'])
+        user_ids = []
+
+        for index in range(options['users']):
+            user, created = User.objects.get_or_create(username=f'{prefix}_{index}')
+            if created:
+                user.set_password(BENCH_PASSWORD)
+                user.save()
+            user_ids.append(user.pk)
+            expenses = self.generate(Expense, EXPENSE, user, options['expenses'], categories, start, today, rng)
+            incomes = self.generate(Income, INCOME, user, options['incomes'], categories, start, today, rng)
+            self.stdout.write(f'{user.username}: {expenses} expenses, {incomes} incomes')
+
+        rows = rebuild_for_users(user_ids)
+        bump_global_version()
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(user_ids)} users ({rows} rollup rows); password "{BENCH_PASSWORD}"'
+        ))
+
+    def ensure_categories(self):
+        categories = []
+        for name, icon, color in CATEGORIES:
+            category, _ = Category.objects.get_or_create(name=name, defaults={'icon': icon, 'color': color})
+            categories.append(category)
+        return categories
+
+    def generate(self, model, kind, user, count, categories, start, today, rng):
+        type_field = 'expense_type' if kind == EXPENSE else 'income_type'
+        descriptions = EXPENSE_DESCRIPTIONS if kind == EXPENSE else INCOME_DESCRIPTIONS
+        types = [name for name, _ in TYPE_WEIGHTS]
+        weights = [weight for _, weight in TYPE_WEIGHTS]
+        span = (today - start).days
+        created = 0
+
+        while created < count:
+            batch = []
+            for _ in range(min(BATCH_SIZE, count - created)):
+                day = start + timedelta(days=rng.randint(0, span))
+                amount = Decimal(rng.lognormvariate(4, 1)).quantize(Decimal('0.01')) + Decimal('1.00')
+                description = f'{rng.choice(descriptions)} {rng.randint(1, 9999)}'
+                fields = {
+                    'user': user,
+                    'category': rng.choice(categories) if rng.random() < 0.9 else None,
+                    'amount': amount,
+                    'description': description,
+                    'date': day,
+                    type_field: rng.choices(types, weights)[0],
+                }
+                if fields[type_field] == 'RECURRING':
+                    fields['recurrence_period'] = rng.choice(['MONTHLY'] * 9 + ['YEARLY'])
+                    fields['next_due_date'] = today + timedelta(days=rng.randint(0, 30))
+                elif fields[type_field] == 'INSTALLMENT':
+                    total = rng.choice([3, 6, 10, 12, 24])
+                    fields['total_installments'] = total
+                    fields['current_installment'] = rng.randint(1, total)
+                    fields['installment_value'] = (amount / total).quantize(Decimal('0.01'))
+                if kind == EXPENSE and day <= today and rng.random() < 0.7:
+                    fields['paid'] = True
+                    fields['paid_date'] = day
+                instance = model(**fields)
+                instance.dedupe_key = transaction_key(user.pk, day, amount, description)
+                batch.append(instance)
+
+            with transaction.atomic():
+                model.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+                sync_many_occurrences(batch, kind)
+            created += len(batch)
+        return created
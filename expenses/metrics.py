@@ -0,0 +1,152 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+MAX_RECORDED_STATEMENTS = 200
+
+current_stats = contextvars.ContextVar('request_stats', default=None)
+
+
+class Histogram:
+    """Cumulative Prometheus histogram, one series per label tuple"""
+
+    def __init__(self, name, documentation, labelnames, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def collect(self):
+        with self._lock:
+            snapshot = {labels: (list(counts), total, count) for labels, (counts, total, count) in self._series.items()}
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for labels, (counts, total, count) in sorted(snapshot.items()):
+            base = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels)]
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                label_text = ','.join(base + [f'le="{bound}"'])
+                lines.append(f'{self.name}_bucket{{{label_text}}} {cumulative}')
+            label_text = ','.join(base)
+            lines.append(f'{self.name}_sum{{{label_text}}} {total}')
+            lines.append(f'{self.name}_count{{{label_text}}} {count}')
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUEST_LABELS = ('view', 'method', 'status')
+
+request_duration = Histogram(
+    'http_request_duration_seconds', 'Wall time spent handling a request.', REQUEST_LABELS,
+)
+db_duration = Histogram(
+    'http_request_db_duration_seconds', 'Time spent in database queries per request.', REQUEST_LABELS,
+)
+db_queries = Histogram(
+    'http_request_db_queries', 'Database queries executed per request.', REQUEST_LABELS, QUERY_COUNT_BUCKETS,
+)
+serialize_duration = Histogram(
+    'http_request_serialize_duration_seconds', 'Time spent serializing and rendering the response.',
+    REQUEST_LABELS,
+)
+response_size = Histogram(
+    'http_response_size_bytes', 'Size of non-streaming response bodies.', REQUEST_LABELS, SIZE_BUCKETS,
+)
+
+REGISTRY = [request_duration, db_duration, db_queries, serialize_duration, response_size]
+
+
+def render_prometheus():
+    lines = []
+    for histogram in REGISTRY:
+        lines.extend(histogram.collect())
+    return '\n'.join(lines) + '\n'
+
+
+class RequestStats:
+    """Per-request counters, shared with the query pool threads through a context variable"""
+
+    def __init__(self, record_sql=False):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.render_time = 0.0
+        self.statements = [] if record_sql else None
+        self._lock = threading.Lock()
+
+    def record_query(self, sql, elapsed):
+        with self._lock:
+            self.queries += 1
+            self.db_time += elapsed
+            if self.statements is not None and len(self.statements) < MAX_RECORDED_STATEMENTS:
+                self.statements.append((elapsed, sql))
+
+    def add_serialize_time(self, elapsed):
+        with self._lock:
+            self.serialize_time += elapsed
+
+    def add_render_time(self, elapsed):
+        with self._lock:
+            self.render_time += elapsed
+
+
+def record_query(execute, sql, params, many, context):
+    """``execute_wrapper`` hook timing every query run on behalf of the current request"""
+    stats = current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.record_query(sql, time.perf_counter() - start)
+
+
+def install_query_recorder(connection, **kwargs):
+    """
+    Attach ``record_query`` to a database connection once (``connection_created`` receiver).
+
+    It is installed permanently rather than with ``connection.execute_wrapper()``
+    per request because async views run queries on other threads, each with
+    its own connection; the context variable routes them to the right request.
+    It sits at the bottom of the wrapper stack so ``execute_wrapper()`` blocks
+    opened by other code still pop their own wrapper.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+@contextmanager
+def timed_serialization():
+    """Count the enclosed block as serialization time of the current request"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = current_stats.get()
+        if stats is not None:
+            stats.add_serialize_time(time.perf_counter() - start)
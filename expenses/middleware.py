@@ -0,0 +1,92 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .metrics import (
+    RequestStats, current_stats, db_duration, db_queries, request_duration, response_size, serialize_duration,
+)
+
+logger = logging.getLogger('expenses.slow_requests')
+
+
+class RequestMetricsMiddleware:
+    """
+    Time every request and report it as a ``Server-Timing`` header and histograms.
+
+    Tracks wall time, database query count and time, serializer plus renderer
+    time and response size, labelled by view name, method and status; the
+    histograms are served by ``/metrics``. With ``SLOW_REQUEST_MS`` set,
+    requests slower than that are logged with their SQL (statements only,
+    never parameters). Works under both WSGI and ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, 'SLOW_REQUEST_MS', 0)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        stats = RequestStats(record_sql=bool(self.slow_ms))
+        token = current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        return self.finish(request, response, stats, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        stats = RequestStats(record_sql=bool(self.slow_ms))
+        token = current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        return self.finish(request, response, stats, time.perf_counter() - start)
+
+    def process_template_response(self, request, response):
+        # Runs right before DRF renders the response; the callback runs right after
+        stats = current_stats.get()
+        if stats is not None:
+            start = time.perf_counter()
+            response.add_post_render_callback(lambda rendered: stats.add_render_time(time.perf_counter() - start))
+        return response
+
+    def finish(self, request, response, stats, elapsed):
+        response['Server-Timing'] = ', '.join([
+            f'app;dur={elapsed * 1000:.1f}',
+            f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries"',
+            f'serialize;dur={stats.serialize_time * 1000:.1f}',
+            f'render;dur={stats.render_time * 1000:.1f}',
+        ])
+
+        match = getattr(request, 'resolver_match', None)
+        labels = (match.view_name if match else 'unmatched', request.method, str(response.status_code))
+        request_duration.observe(elapsed, *labels)
+        db_duration.observe(stats.db_time, *labels)
+        db_queries.observe(stats.queries, *labels)
+        serialize_duration.observe(stats.serialize_time + stats.render_time, *labels)
+        if not response.streaming:
+            response_size.observe(len(response.content), *labels)
+
+        if self.slow_ms and elapsed * 1000 >= self.slow_ms:
+            self.log_slow_request(request, response, stats, elapsed)
+        return response
+
+    def log_slow_request(self, request, response, stats, elapsed):
+        statements = '\n'.join(f'  {seconds * 1000:8.1f} ms  {sql}' for seconds, sql in stats.statements)
+        logger.warning(
+            "Slow request %s %s -> %s took %.1f ms (%d queries, %.1f ms in db)\n%s",
+            request.method, request.get_full_path(), response.status_code, elapsed * 1000,
+            stats.queries, stats.db_time * 1000, statements,
+            extra={'duration_ms': round(elapsed * 1000, 1), 'queries': stats.queries},
+        )
@@ -0,0 +1,107 @@
+# Generated by Django 4.2.10 on 2026-10-18 07:37
+
+import calendar
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+
+# Expansion rules as of this migration, frozen here so later changes to
+# expenses.occurrences can't change what it does on a fresh database.
+
+def add_months(value, months):
+    month_index = value.month - 1 + months
+    year = value.year + month_index // 12
+    month = month_index % 12 + 1
+    day = min(value.day, calendar.monthrange(year, month)[1])
+    return date(year, month, day)
+
+
+def step(value, period, count):
+    if period == 'DAILY':
+        return value + timedelta(days=count)
+    if period == 'YEARLY':
+        return add_months(value, 12 * count)
+    return add_months(value, count)
+
+
+def expand(parent, source_type, until):
+    paid = bool(getattr(parent, 'paid', False))
+    if source_type == 'RECURRING':
+        start = parent.next_due_date or parent.date
+        count = 0
+        due = start
+        while due <= until:
+            yield due, parent.amount, None, paid and count == 0
+            count += 1
+            due = step(start, parent.recurrence_period, count)
+    elif source_type == 'INSTALLMENT' and parent.total_installments:
+        current = parent.current_installment or 1
+        amount = parent.installment_value
+        if amount is None:
+            amount = (parent.amount / parent.total_installments).quantize(Decimal('0.01'))
+        for number in range(current, parent.total_installments + 1):
+            due = add_months(parent.date, number - 1)
+            if due > until:
+                break
+            yield due, amount, number, paid and number == current
+    elif parent.date <= until:
+        yield parent.date, parent.amount, None, paid
+
+
+def materialize_existing(apps, schema_editor):
+    Occurrence = apps.get_model('expenses', 'Occurrence')
+    today = timezone.localdate()
+    horizon = getattr(settings, 'OCCURRENCE_HORIZON_MONTHS', 24)
+    until = add_months(today.replace(day=1), horizon + 1) - timedelta(days=1)
+    for model_name, kind, type_field in (('Expense', 'EXPENSE', 'expense_type'), ('Income', 'INCOME', 'income_type')):
+        parent_field = model_name.lower()
+        batch = []
+        for parent in apps.get_model('expenses', model_name).objects.order_by('pk').iterator(chunk_size=1000):
+            source_type = getattr(parent, type_field) or 'ONETIME'
+            batch.extend(
+                Occurrence(
+                    user_id=parent.user_id, kind=kind, source_type=source_type, due_date=due_date,
+                    amount=amount, installment_number=number, paid=paid, **{parent_field: parent},
+                )
+                for due_date, amount, number, paid in expand(parent, source_type, until)
+            )
+            if len(batch) >= 1000:
+                Occurrence.objects.bulk_create(batch)
+                batch = []
+        Occurrence.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('expenses', '0006_expense_paid_expense_paid_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Occurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('EXPENSE', 'Despesa'), ('INCOME', 'Receita')], max_length=10)),
+                ('source_type', models.CharField(choices=[('RECURRING', 'Recorrente'), ('INSTALLMENT', 'Parcelada'), ('ONETIME', 'Única')], max_length=20)),
+                ('due_date', models.DateField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('installment_number', models.PositiveIntegerField(blank=True, null=True)),
+                ('paid', models.BooleanField(default=False)),
+                ('expense', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='expenses.expense')),
+                ('income', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='expenses.income')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['due_date'],
+                'indexes': [models.Index(fields=['user', 'due_date'], name='occurrence_user_due_idx')],
+            },
+        ),
+        migrations.RunPython(materialize_existing, migrations.RunPython.noop),
+    ]
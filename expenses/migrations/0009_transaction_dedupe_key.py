@@ -0,0 +1,58 @@
+# Generated by Django 4.2.10 on 2026-10-18 07:41
+
+import hashlib
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+# Key as of this migration, frozen here so later changes to
+# expenses.models.transaction_key can't change what it does on a fresh database.
+
+def transaction_key(user_id, date, amount, description):
+    normalized = ' '.join(str(description).split()).casefold()
+    amount = Decimal(amount).quantize(Decimal('0.01'))
+    raw = f"{user_id}|{date}|{amount}|{normalized}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def fill_dedupe_keys(apps, schema_editor):
+    for model_name in ('Expense', 'Income'):
+        model = apps.get_model('expenses', model_name)
+        batch = []
+        for row in model.objects.order_by('pk').iterator(chunk_size=1000):
+            row.dedupe_key = transaction_key(row.user_id, row.date, row.amount, row.description)
+            batch.append(row)
+            if len(batch) >= 1000:
+                model.objects.bulk_update(batch, ['dedupe_key'])
+                batch = []
+        model.objects.bulk_update(batch, ['dedupe_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0008_transaction_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expense',
+            name='dedupe_key',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='income',
+            name='dedupe_key',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'dedupe_key'], name='expense_user_dedupe_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['user', 'dedupe_key'], name='income_user_dedupe_idx'),
+        ),
+        migrations.RunPython(fill_dedupe_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.10 on 2026-10-18 07:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_rollups(apps, schema_editor):
+    from django.db.models import Count, Sum
+    from django.db.models.functions import TruncMonth
+
+    MonthlyRollup = apps.get_model('expenses', 'MonthlyRollup')
+    sources = (
+        ('Expense', 'EXPENSE', ['user', 'month', 'category', 'paid']),
+        ('Income', 'INCOME', ['user', 'month', 'category']),
+    )
+    for model_name, kind, group_by in sources:
+        grouped = (
+            apps.get_model('expenses', model_name).objects
+            .annotate(month=TruncMonth('date'))
+            .values(*group_by)
+            .annotate(total=Sum('amount'), count=Count('id'))
+            .order_by()
+        )
+        MonthlyRollup.objects.bulk_create([
+            MonthlyRollup(
+                user_id=row['user'], month=row['month'], category_id=row['category'], kind=kind,
+                paid=row.get('paid', False), total=row['total'], count=row['count'],
+            )
+            for row in grouped
+        ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('expenses', '0010_sync_tombstones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('kind', models.CharField(choices=[('EXPENSE', 'Despesa'), ('INCOME', 'Receita')], max_length=10)),
+                ('paid', models.BooleanField(default=False)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='expenses.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='monthlyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('category__isnull', False)), fields=('user', 'month', 'category', 'kind', 'paid'), name='rollup_unique_with_category'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('category__isnull', True)), fields=('user', 'month', 'kind', 'paid'), name='rollup_unique_without_category'),
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.10 on 2026-10-18 07:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0011_monthly_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SchedulerCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('run_date', models.DateField()),
+                ('last_pk', models.BigIntegerField(default=0)),
+                ('finished', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(condition=models.Q(('expense_type', 'RECURRING')), fields=['next_due_date'], name='expense_recurring_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(condition=models.Q(('expense_type', 'INSTALLMENT')), fields=['date'], name='expense_installment_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(condition=models.Q(('income_type', 'RECURRING')), fields=['next_due_date'], name='income_recurring_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(condition=models.Q(('income_type', 'INSTALLMENT')), fields=['date'], name='income_installment_date_idx'),
+        ),
+    ]
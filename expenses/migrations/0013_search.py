@@ -0,0 +1,88 @@
+# Generated by Django 4.2.10 on 2026-10-18 08:06
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+SEARCH_INDEXES = {
+    'Expense': [
+        django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='expense_search_idx'),
+        django.contrib.postgres.indexes.GinIndex(fields=['description'], name='expense_description_trgm_idx', opclasses=['gin_trgm_ops']),
+    ],
+    'Income': [
+        django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='income_search_idx'),
+        django.contrib.postgres.indexes.GinIndex(fields=['description'], name='income_description_trgm_idx', opclasses=['gin_trgm_ops']),
+    ],
+}
+
+# Keeps search_vector current for every write path, bulk_create and raw
+# updates included; saves that don't touch the description skip it
+CREATE_TRIGGER = """
+CREATE OR REPLACE FUNCTION expenses_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := to_tsvector('portuguese', coalesce(NEW.description, ''));
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+TABLES = ['expenses_expense', 'expenses_income']
+
+
+def create_search_structures(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(CREATE_TRIGGER)
+    for table in TABLES:
+        schema_editor.execute(
+            f'CREATE TRIGGER {table}_search_vector BEFORE INSERT OR UPDATE OF description, search_vector '
+            f'ON {table} FOR EACH ROW EXECUTE FUNCTION expenses_search_vector_update()'
+        )
+        schema_editor.execute(f"UPDATE {table} SET search_vector = to_tsvector('portuguese', coalesce(description, ''))")
+    for model_name, indexes in SEARCH_INDEXES.items():
+        for index in indexes:
+            schema_editor.add_index(apps.get_model('expenses', model_name), index)
+
+
+def drop_search_structures(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name, indexes in SEARCH_INDEXES.items():
+        for index in indexes:
+            schema_editor.remove_index(apps.get_model('expenses', model_name), index)
+    for table in TABLES:
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {table}_search_vector ON {table}')
+    schema_editor.execute('DROP FUNCTION IF EXISTS expenses_search_vector_update()')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0012_scheduler'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='expense',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='income',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # GIN indexes only exist on PostgreSQL; other databases get the state alone
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name=model_name.lower(), index=index)
+                for model_name, indexes in SEARCH_INDEXES.items()
+                for index in indexes
+            ],
+            database_operations=[
+                migrations.RunPython(create_search_structures, drop_search_structures),
+            ],
+        ),
+    ]
@@ -0,0 +1,106 @@
+# Generated by Django 4.2.10 on 2026-10-18 08:09
+
+from django.conf import settings
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+import django.db.models.deletion
+
+SEARCH_INDEXES = {
+    'ArchivedExpense': [
+        django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='archived_expense_search_idx'),
+        django.contrib.postgres.indexes.GinIndex(fields=['description'], name='archived_expense_trgm_idx', opclasses=['gin_trgm_ops']),
+    ],
+    'ArchivedIncome': [
+        django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='archived_income_search_idx'),
+        django.contrib.postgres.indexes.GinIndex(fields=['description'], name='archived_income_trgm_idx', opclasses=['gin_trgm_ops']),
+    ],
+}
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name, indexes in SEARCH_INDEXES.items():
+        for index in indexes:
+            schema_editor.add_index(apps.get_model('expenses', model_name), index)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name, indexes in SEARCH_INDEXES.items():
+        for index in indexes:
+            schema_editor.remove_index(apps.get_model('expenses', model_name), index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('expenses', '0013_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedIncome',
+            fields=[
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('description', models.TextField()),
+                ('date', models.DateField()),
+                ('income_type', models.CharField(choices=[('RECURRING', 'Recorrente'), ('INSTALLMENT', 'Parcelada'), ('ONETIME', 'Única')], default='ONETIME', max_length=20)),
+                ('recurrence_period', models.CharField(blank=True, choices=[('DAILY', 'Diária'), ('MONTHLY', 'Mensal'), ('YEARLY', 'Anual')], max_length=20, null=True)),
+                ('next_due_date', models.DateField(blank=True, null=True)),
+                ('total_installments', models.PositiveIntegerField(blank=True, null=True)),
+                ('current_installment', models.PositiveIntegerField(blank=True, null=True)),
+                ('installment_value', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('dedupe_key', models.CharField(blank=True, editable=False, max_length=64)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='expenses.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-date', '-id'], name='archived_income_user_date_idx'), models.Index(fields=['user', 'dedupe_key'], name='archived_income_dedupe_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedExpense',
+            fields=[
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('description', models.TextField()),
+                ('date', models.DateField()),
+                ('expense_type', models.CharField(choices=[('RECURRING', 'Recorrente'), ('INSTALLMENT', 'Parcelada'), ('ONETIME', 'Única')], default='ONETIME', max_length=20)),
+                ('recurrence_period', models.CharField(blank=True, choices=[('DAILY', 'Diária'), ('MONTHLY', 'Mensal'), ('YEARLY', 'Anual')], max_length=20, null=True)),
+                ('next_due_date', models.DateField(blank=True, null=True)),
+                ('total_installments', models.PositiveIntegerField(blank=True, null=True)),
+                ('current_installment', models.PositiveIntegerField(blank=True, null=True)),
+                ('installment_value', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('paid', models.BooleanField(default=False)),
+                ('paid_date', models.DateField(blank=True, null=True)),
+                ('dedupe_key', models.CharField(blank=True, editable=False, max_length=64)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='expenses.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-date', '-id'], name='archived_expense_user_date_idx'), models.Index(fields=['user', 'dedupe_key'], name='archived_expense_dedupe_idx')],
+            },
+        ),
+        # GIN indexes only exist on PostgreSQL, as in 0013_search
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name=model_name.lower(), index=index)
+                for model_name, indexes in SEARCH_INDEXES.items()
+                for index in indexes
+            ],
+            database_operations=[
+                migrations.RunPython(create_search_indexes, drop_search_indexes),
+            ],
+        ),
+    ]
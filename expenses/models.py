@@ -1,11 +1,26 @@
+import hashlib
+from decimal import Decimal
+
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+
+
+def transaction_key(user_id, date, amount, description):
+    """Stable hash of (user, date, amount, description) used to detect duplicate imports"""
+    normalized = ' '.join(str(description).split()).casefold()
+    amount = Decimal(amount).quantize(Decimal('0.01'))
+    raw = f"{user_id}|{date}|{amount}|{normalized}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
 
 class Category(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     icon = models.CharField(max_length=50, blank=True)  # For storing Material-UI icon names
     color = models.CharField(max_length=20, blank=True)  # For category color coding
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return self.name
@@ -13,7 +28,8 @@ class Category(models.Model):
     class Meta:
         verbose_name_plural = "Categories"
 
-class Expense(models.Model):
+class ExpenseFields(models.Model):
+    """Columns shared by ``Expense`` and ``ArchivedExpense``"""
     class ExpenseType(models.TextChoices):
         RECURRING = 'RECURRING', 'Recorrente'
         INSTALLMENT = 'INSTALLMENT', 'Parcelada'
@@ -46,13 +62,56 @@ class Expense(models.Model):
     installment_value = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     paid = models.BooleanField(default=False)  # New field
     paid_date = models.DateField(null=True, blank=True)  # New field
+    dedupe_key = models.CharField(max_length=64, blank=True, editable=False)
+    # Full-text vector of the description, kept current by a PostgreSQL trigger
+    # on the hot tables; archived rows keep the vector they had when moved
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.description} - R${self.amount}"
 
-class Income(models.Model):
+    class Meta:
+        abstract = True
+
+
+class Expense(ExpenseFields):
+    def save(self, *args, **kwargs):
+        self.dedupe_key = transaction_key(self.user_id, self.date, self.amount, self.description)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'dedupe_key'}
+        super().save(*args, **kwargs)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-date', '-id'], name='expense_user_date_idx'),
+            models.Index(fields=['user', 'paid', 'date'], name='expense_user_paid_date_idx'),
+            models.Index(fields=['user', 'dedupe_key'], name='expense_user_dedupe_idx'),
+            models.Index(fields=['user', 'updated_at'], name='expense_user_updated_idx'),
+            models.Index(
+                fields=['user', 'next_due_date'],
+                name='expense_user_recurring_due_idx',
+                condition=models.Q(expense_type='RECURRING'),
+            ),
+            # Cross-user scans of the batch scheduler (expenses.scheduler)
+            models.Index(
+                fields=['next_due_date'],
+                name='expense_recurring_due_idx',
+                condition=models.Q(expense_type='RECURRING'),
+            ),
+            models.Index(
+                fields=['date'],
+                name='expense_installment_date_idx',
+                condition=models.Q(expense_type='INSTALLMENT'),
+            ),
+            # /api/search/ (expenses.search); created on PostgreSQL only
+            GinIndex(fields=['search_vector'], name='expense_search_idx'),
+            GinIndex(fields=['description'], name='expense_description_trgm_idx', opclasses=['gin_trgm_ops']),
+        ]
+
+class IncomeFields(models.Model):
+    """Columns shared by ``Income`` and ``ArchivedIncome``"""
     class IncomeType(models.TextChoices):
         RECURRING = 'RECURRING', 'Recorrente'
         INSTALLMENT = 'INSTALLMENT', 'Parcelada'
@@ -83,8 +142,173 @@ class Income(models.Model):
     total_installments = models.PositiveIntegerField(null=True, blank=True)
     current_installment = models.PositiveIntegerField(null=True, blank=True)
     installment_value = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    dedupe_key = models.CharField(max_length=64, blank=True, editable=False)
+    # Full-text vector of the description, kept current by a PostgreSQL trigger
+    # on the hot tables; archived rows keep the vector they had when moved
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.description} - R${self.amount}"
+
+    class Meta:
+        abstract = True
+
+
+class Income(IncomeFields):
+    def save(self, *args, **kwargs):
+        self.dedupe_key = transaction_key(self.user_id, self.date, self.amount, self.description)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'dedupe_key'}
+        super().save(*args, **kwargs)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-date', '-id'], name='income_user_date_idx'),
+            models.Index(fields=['user', 'dedupe_key'], name='income_user_dedupe_idx'),
+            models.Index(fields=['user', 'updated_at'], name='income_user_updated_idx'),
+            models.Index(
+                fields=['user', 'next_due_date'],
+                name='income_user_recurring_due_idx',
+                condition=models.Q(income_type='RECURRING'),
+            ),
+            # Cross-user scans of the batch scheduler (expenses.scheduler)
+            models.Index(
+                fields=['next_due_date'],
+                name='income_recurring_due_idx',
+                condition=models.Q(income_type='RECURRING'),
+            ),
+            models.Index(
+                fields=['date'],
+                name='income_installment_date_idx',
+                condition=models.Q(income_type='INSTALLMENT'),
+            ),
+            # /api/search/ (expenses.search); created on PostgreSQL only
+            GinIndex(fields=['search_vector'], name='income_search_idx'),
+            GinIndex(fields=['description'], name='income_description_trgm_idx', opclasses=['gin_trgm_ops']),
+        ]
+
+
+class ArchivedExpense(ExpenseFields):
+    """A settled one-time expense moved out of ``Expense`` by ``archive_transactions``, same id"""
+    id = models.BigIntegerField(primary_key=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-date', '-id'], name='archived_expense_user_date_idx'),
+            models.Index(fields=['user', 'dedupe_key'], name='archived_expense_dedupe_idx'),
+            # Created on PostgreSQL only, like the hot table's
+            GinIndex(fields=['search_vector'], name='archived_expense_search_idx'),
+            GinIndex(fields=['description'], name='archived_expense_trgm_idx', opclasses=['gin_trgm_ops']),
+        ]
+
+
+class ArchivedIncome(IncomeFields):
+    """A one-time income moved out of ``Income`` by ``archive_transactions``, same id"""
+    id = models.BigIntegerField(primary_key=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-date', '-id'], name='archived_income_user_date_idx'),
+            models.Index(fields=['user', 'dedupe_key'], name='archived_income_dedupe_idx'),
+            GinIndex(fields=['search_vector'], name='archived_income_search_idx'),
+            GinIndex(fields=['description'], name='archived_income_trgm_idx', opclasses=['gin_trgm_ops']),
+        ]
+
+
+class Occurrence(models.Model):
+    """A concrete dated instance of an expense or income, expanded from its recurrence rules"""
+    class Kind(models.TextChoices):
+        EXPENSE = 'EXPENSE', 'Despesa'
+        INCOME = 'INCOME', 'Receita'
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    source_type = models.CharField(max_length=20, choices=Expense.ExpenseType.choices)
+    expense = models.ForeignKey(
+        'Expense', on_delete=models.CASCADE, null=True, blank=True, related_name='occurrences'
+    )
+    income = models.ForeignKey(
+        'Income', on_delete=models.CASCADE, null=True, blank=True, related_name='occurrences'
+    )
+    due_date = models.DateField()
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    installment_number = models.PositiveIntegerField(null=True, blank=True)
+    paid = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.due_date} - R${self.amount}"
+
+    class Meta:
+        ordering = ['due_date']
+        indexes = [
+            models.Index(fields=['user', 'due_date'], name='occurrence_user_due_idx'),
+        ]
+
+
+class Tombstone(models.Model):
+    """Record of a deleted row so incremental sync clients can drop it"""
+    class Kind(models.TextChoices):
+        EXPENSE = 'expense', 'Despesa'
+        INCOME = 'income', 'Receita'
+        CATEGORY = 'category', 'Categoria'
+
+    # Plain integer instead of a foreign key: tombstones are written while
+    # a user's rows are being cascade-deleted and must not block that.
+    owner_id = models.IntegerField(null=True, blank=True)
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} deleted at {self.deleted_at}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner_id', 'deleted_at'], name='tombstone_owner_deleted_idx'),
+        ]
+
+class MonthlyRollup(models.Model):
+    """Per-user monthly sums and counts by category, kind and paid status"""
+    class Kind(models.TextChoices):
+        EXPENSE = 'EXPENSE', 'Despesa'
+        INCOME = 'INCOME', 'Receita'
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    month = models.DateField()  # First day of the month
+    category = models.ForeignKey('Category', on_delete=models.CASCADE, null=True, blank=True)
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    paid = models.BooleanField(default=False)  # Always False for incomes
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user} {self.month:%Y-%m} {self.kind} - R${self.total}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'month', 'category', 'kind', 'paid'],
+                condition=models.Q(category__isnull=False),
+                name='rollup_unique_with_category',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'month', 'kind', 'paid'],
+                condition=models.Q(category__isnull=True),
+                name='rollup_unique_without_category',
+            ),
+        ]
+
+
+class SchedulerCheckpoint(models.Model):
+    """Progress of a scheduler pass, so an interrupted run resumes where it stopped"""
+    name = models.CharField(max_length=50, unique=True)
+    run_date = models.DateField()
+    last_pk = models.BigIntegerField(default=0)
+    finished = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        state = 'finished' if self.finished else f'at pk {self.last_pk}'
+        return f"{self.name} {self.run_date} {state}"
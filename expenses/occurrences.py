@@ -0,0 +1,172 @@
+import calendar
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+RECURRING = 'RECURRING'
+INSTALLMENT = 'INSTALLMENT'
+ONETIME = 'ONETIME'
+
+EXPENSE = 'EXPENSE'
+INCOME = 'INCOME'
+
+
+def horizon_months():
+    return getattr(settings, 'OCCURRENCE_HORIZON_MONTHS', 24)
+
+
+def default_until(today=None):
+    today = today or timezone.localdate()
+    return add_months(today.replace(day=1), horizon_months() + 1) - timedelta(days=1)
+
+
+def add_months(value, months):
+    month_index = value.month - 1 + months
+    year = value.year + month_index // 12
+    month = month_index % 12 + 1
+    day = min(value.day, calendar.monthrange(year, month)[1])
+    return date(year, month, day)
+
+
+def step(value, period, count):
+    if period == 'DAILY':
+        return value + timedelta(days=count)
+    if period == 'YEARLY':
+        return add_months(value, 12 * count)
+    return add_months(value, count)
+
+
+def parent_type(parent):
+    return getattr(parent, 'expense_type', None) or getattr(parent, 'income_type', None) or ONETIME
+
+
+def expand(parent, until):
+    """
+    Yield ``(due_date, amount, installment_number, paid)`` for a parent row.
+
+    Recurring rows repeat from ``next_due_date`` (or ``date``) up to ``until``;
+    installment rows yield the remaining installments starting at
+    ``current_installment``, one month apart from ``date``. Only the first
+    yielded occurrence carries the parent's ``paid`` flag, the rest are
+    projections.
+    """
+    paid = bool(getattr(parent, 'paid', False))
+    source_type = parent_type(parent)
+
+    if source_type == RECURRING:
+        start = parent.next_due_date or parent.date
+        count = 0
+        due = start
+        while due <= until:
+            yield due, parent.amount, None, paid and count == 0
+            count += 1
+            due = step(start, parent.recurrence_period, count)
+
+    elif source_type == INSTALLMENT and parent.total_installments:
+        current = parent.current_installment or 1
+        amount = parent.installment_value
+        if amount is None:
+            amount = (parent.amount / parent.total_installments).quantize(Decimal('0.01'))
+        for number in range(current, parent.total_installments + 1):
+            due = add_months(parent.date, number - 1)
+            if due > until:
+                break
+            yield due, amount, number, paid and number == current
+
+    else:
+        if parent.date <= until:
+            yield parent.date, parent.amount, None, paid
+
+
+def build_occurrences(occurrence_model, parent, kind, until):
+    parent_field = 'expense' if kind == EXPENSE else 'income'
+    source_type = parent_type(parent)
+    return [
+        occurrence_model(
+            user_id=parent.user_id,
+            kind=kind,
+            source_type=source_type,
+            due_date=due_date,
+            amount=amount,
+            installment_number=number,
+            paid=paid,
+            **{parent_field: parent},
+        )
+        for due_date, amount, number, paid in expand(parent, until)
+    ]
+
+
+def history(parent_field, today=None):
+    """
+    Occurrences that resyncing their parent keeps.
+
+    The scheduler moves a recurring row's ``next_due_date`` (or a plan's
+    ``current_installment``) forward; the occurrences left behind, due before
+    both today and that current due date, are the row's paid/unpaid history.
+    Expansion starts at the current due date, so it never yields them again.
+    """
+    today = today or timezone.localdate()
+    type_field = f'{parent_field}__{parent_field}_type'
+    return Q(due_date__lt=today) & (
+        Q(
+            **{type_field: RECURRING},
+            source_type=RECURRING,
+            due_date__lt=Coalesce(F(f'{parent_field}__next_due_date'), F(f'{parent_field}__date')),
+        )
+        | Q(
+            **{type_field: INSTALLMENT},
+            source_type=INSTALLMENT,
+            installment_number__lt=Coalesce(F(f'{parent_field}__current_installment'), Value(1)),
+        )
+    )
+
+
+def sync_occurrences(parent, kind, until=None):
+    """Replace the materialized occurrences of a single expense or income, keeping its history"""
+    sync_many_occurrences([parent], kind, until)
+
+
+def sync_many_occurrences(parents, kind, until=None, today=None):
+    """Replace the occurrences of many parents, except their ``history``, with one delete and one bulk insert"""
+    from .models import Occurrence
+    until = until or default_until(today)
+    parent_field = 'expense' if kind == EXPENSE else 'income'
+    occurrences = []
+    for parent in parents:
+        occurrences.extend(build_occurrences(Occurrence, parent, kind, until))
+    stale = Occurrence.objects.filter(
+        **{f'{parent_field}__in': [parent.pk for parent in parents]}
+    ).exclude(history(parent_field, today))
+    with transaction.atomic():
+        stale.delete()
+        Occurrence.objects.bulk_create(occurrences, batch_size=1000)
+
+
+def rebuild_occurrences(expense_model, income_model, occurrence_model, until=None, users=None, batch_size=1000):
+    """Recompute every occurrence but the ``history``, optionally restricted to some users, in bounded batches"""
+    until = until or default_until()
+    created = 0
+    for model, kind in ((expense_model, EXPENSE), (income_model, INCOME)):
+        parent_field = 'expense' if kind == EXPENSE else 'income'
+        parents = model.objects.order_by('pk')
+        existing = occurrence_model.objects.filter(**{f'{parent_field}__isnull': False}).exclude(history(parent_field))
+        if users is not None:
+            parents = parents.filter(user__in=users)
+            existing = existing.filter(user__in=users)
+        with transaction.atomic():
+            existing.delete()
+            batch = []
+            for parent in parents.iterator(chunk_size=batch_size):
+                batch.extend(build_occurrences(occurrence_model, parent, kind, until))
+                if len(batch) >= batch_size:
+                    occurrence_model.objects.bulk_create(batch)
+                    created += len(batch)
+                    batch = []
+            occurrence_model.objects.bulk_create(batch)
+            created += len(batch)
+    return created
@@ -0,0 +1,133 @@
+import base64
+import heapq
+from collections import OrderedDict
+from datetime import date
+from operator import attrgetter
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def newest_first(*groups, key=attrgetter('date', 'pk')):
+    """Lazily merge row groups that are each ordered by ``(date, id)`` descending"""
+    return heapq.merge(*groups, key=key, reverse=True)
+
+
+class DateKeysetPagination(BasePagination):
+    """
+    Keyset pagination over ``(date, id)`` in descending order.
+
+    The cursor carries the last row's date and id, so each page is an index
+    range scan and rows inserted while a client is paging never shift or
+    duplicate results. Pagination is opt-in: requests without ``cursor`` or
+    ``page_size`` get the full, unpaginated list the frontend expects.
+    Views with ``get_archived_queryset`` (``expenses.archive``) get archived
+    rows merged in once a page reaches back to them.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 50
+    max_page_size = 500
+    invalid_cursor_message = 'Cursor inválido'
+
+    def page_queryset(self, queryset, request):
+        """The sliced queryset for the requested page, or None when pagination wasn't asked for"""
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by('-date', '-id')
+
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            last_date, last_id = cursor
+            queryset = queryset.filter(Q(date__lt=last_date) | Q(date=last_date, id__lt=last_id))
+
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, rows):
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def archived_page(self, rows, request, view):
+        """The same page over the view's archive, or None when no archived row can land on it"""
+        get_archived = getattr(view, 'get_archived_queryset', None)
+        if get_archived is None:
+            return None
+        # A full page ending after the archive's newest date can't include archived rows
+        oldest = rows[self.page_size - 1].date if len(rows) > self.page_size else None
+        archived = get_archived(oldest)
+        return None if archived is None else self.page_queryset(archived, request)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.page_queryset(queryset, request)
+        if queryset is None:
+            return None
+        rows = list(queryset)
+        archived = self.archived_page(rows, request, view)
+        if archived is not None:
+            rows = list(newest_first(rows, archived))
+        return self.set_page(rows)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset = self.page_queryset(queryset, request)
+        if queryset is None:
+            return None
+        rows = [row async for row in queryset]
+        archived = await sync_to_async(self.archived_page)(rows, request, view)
+        if archived is not None:
+            rows = list(newest_first(rows, [row async for row in archived]))
+        return self.set_page(rows)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii')
+            last_date, last_id = raw.split('|')
+            return date.fromisoformat(last_date), int(last_id)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance):
+        raw = f'{instance.date.isoformat()}|{instance.pk}'
+        return base64.urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param, self.page_size)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
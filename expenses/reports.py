@@ -0,0 +1,338 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.db import connections, router
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import ArchivedExpense, ArchivedIncome, Category, Expense, Income, MonthlyRollup, Occurrence
+from .occurrences import add_months
+
+UPCOMING_WINDOW_DAYS = 30
+RECENT_LIMIT = 5
+
+ZERO = Value(Decimal('0.00'), output_field=DecimalField(max_digits=12, decimal_places=2))
+
+
+def _sum(field='amount', **kwargs):
+    return Coalesce(Sum(field, **kwargs), ZERO)
+
+
+def expense_totals(user, today=None):
+    """Totals, paid/unpaid, overdue and upcoming sums for a user's expenses in one query"""
+    today = today or timezone.localdate()
+    horizon = today + timedelta(days=UPCOMING_WINDOW_DAYS)
+    # Recurring expenses are due on next_due_date, everything else on date
+    recurring_due = Q(expense_type=Expense.ExpenseType.RECURRING, next_due_date__isnull=False)
+    upcoming = (
+        (recurring_due & Q(next_due_date__gt=today, next_due_date__lte=horizon))
+        | (~recurring_due & Q(date__gt=today, date__lte=horizon))
+    )
+    return Expense.objects.filter(user=user).aggregate(
+        total_expenses=_sum(),
+        paid_expenses=_sum(filter=Q(paid=True)),
+        unpaid_expenses=_sum(filter=Q(paid=False)),
+        pending_expenses=_sum(filter=Q(paid=False, date__lt=today)),
+        upcoming_expenses=_sum(filter=upcoming),
+    )
+
+
+def income_totals(user):
+    return Income.objects.filter(user=user).aggregate(total_incomes=_sum())
+
+
+def category_totals(queryset):
+    return dict(
+        queryset.filter(category__isnull=False)
+        .values_list('category')
+        .annotate(total=Sum('amount'))
+        .order_by()
+    )
+
+
+def archived_totals(queryset):
+    """Per-category totals of archived rows, ``None`` standing for rows without a category"""
+    return dict(queryset.values_list('category').annotate(total=Sum('amount')).order_by())
+
+
+def add_archived(totals, archived):
+    """Fold archived per-category totals into the hot ones; returns the archived grand total"""
+    for category_id, total in archived.items():
+        if category_id is not None:
+            totals[category_id] = totals.get(category_id, Decimal('0.00')) + total
+    return sum(archived.values(), Decimal('0.00'))
+
+
+def with_categories(totals, categories):
+    """Per-category totals, keeping categories without rows at zero like the dashboard does"""
+    return [
+        {'id': category_id, 'name': name, 'total': totals.get(category_id, Decimal('0.00'))}
+        for category_id, name in categories
+    ]
+
+
+def recent_transactions(queryset):
+    return list(
+        queryset.order_by('-date', '-id').values('id', 'description', 'amount', 'date', 'category')[:RECENT_LIMIT]
+    )
+
+
+def summary_queries(user, today):
+    """
+    The independent queries behind the summary, as zero-argument callables.
+
+    None of them depends on another's result, so the async summary view can
+    run them concurrently; ``assemble_summary`` combines their results.
+    Archived rows are all settled and old, so they only add to the totals.
+    """
+    expenses = Expense.objects.filter(user=user)
+    incomes = Income.objects.filter(user=user)
+    return {
+        'categories': lambda: list(Category.objects.order_by('name').values_list('id', 'name')),
+        'expense_totals': lambda: expense_totals(user, today),
+        'income_totals': lambda: income_totals(user),
+        'expenses_by_category': lambda: category_totals(expenses),
+        'incomes_by_category': lambda: category_totals(incomes),
+        'archived_expenses': lambda: archived_totals(ArchivedExpense.objects.filter(user=user)),
+        'archived_incomes': lambda: archived_totals(ArchivedIncome.objects.filter(user=user)),
+        'recent_expenses': lambda: recent_transactions(expenses),
+        'recent_incomes': lambda: recent_transactions(incomes),
+    }
+
+
+def assemble_summary(results):
+    categories = results['categories']
+    summary = dict(results['expense_totals'])
+    summary.update(results['income_totals'])
+    archived_expenses = add_archived(results['expenses_by_category'], results['archived_expenses'])
+    summary['total_expenses'] += archived_expenses
+    summary['paid_expenses'] += archived_expenses
+    summary['total_incomes'] += add_archived(results['incomes_by_category'], results['archived_incomes'])
+    summary['balance'] = summary['total_incomes'] - summary['total_expenses']
+    summary['categories_count'] = len(categories)
+    summary['expenses_by_category'] = with_categories(results['expenses_by_category'], categories)
+    summary['incomes_by_category'] = with_categories(results['incomes_by_category'], categories)
+    summary['recent_expenses'] = results['recent_expenses']
+    summary['recent_incomes'] = results['recent_incomes']
+    return summary
+
+
+def build_summary(user, today=None):
+    """Everything the dashboard cards and category breakdowns need, computed in SQL"""
+    today = today or timezone.localdate()
+    queries = summary_queries(user, today)
+    return assemble_summary({name: query() for name, query in queries.items()})
+
+
+def build_forecast(user, months, today=None):
+    """Expected incomes, expenses and balance per month from the materialized occurrences"""
+    today = today or timezone.localdate()
+    start = today.replace(day=1)
+    end = add_months(start, months) - timedelta(days=1)
+
+    buckets = {}
+    for index in range(months):
+        month = add_months(start, index)
+        buckets[month] = {
+            'month': month,
+            'expected_expenses': Decimal('0.00'),
+            'expected_incomes': Decimal('0.00'),
+            'projected_balance': Decimal('0.00'),
+            'details': {'recurring': 0, 'installments': 0, 'one_time': 0},
+        }
+
+    rows = (
+        Occurrence.objects.filter(user=user, due_date__range=(start, end), paid=False)
+        .annotate(month=TruncMonth('due_date'))
+        .values('month', 'kind', 'source_type')
+        .annotate(total=Sum('amount'), count=Count('id'))
+        .order_by()
+    )
+    detail_keys = {
+        Expense.ExpenseType.RECURRING: 'recurring',
+        Expense.ExpenseType.INSTALLMENT: 'installments',
+        Expense.ExpenseType.ONETIME: 'one_time',
+    }
+    for row in rows:
+        bucket = buckets[row['month']]
+        if row['kind'] == Occurrence.Kind.INCOME:
+            bucket['expected_incomes'] += row['total']
+        else:
+            bucket['expected_expenses'] += row['total']
+            bucket['details'][detail_keys[row['source_type']]] += row['count']
+
+    for bucket in buckets.values():
+        bucket['projected_balance'] = bucket['expected_incomes'] - bucket['expected_expenses']
+    return list(buckets.values())
+
+
+def build_monthly_report(user, year):
+    """Per-month and per-category totals for a year, read from the rollup table"""
+    rows = (
+        MonthlyRollup.objects.filter(user=user, month__year=year)
+        .values('month', 'category', 'category__name', 'kind', 'paid', 'total', 'count')
+        .order_by('month', 'kind', 'category__name')
+    )
+    months = {}
+    for row in rows:
+        month = months.setdefault(row['month'], {
+            'month': row['month'],
+            'expenses': Decimal('0.00'),
+            'incomes': Decimal('0.00'),
+            'paid_expenses': Decimal('0.00'),
+            'categories': [],
+        })
+        if row['kind'] == MonthlyRollup.Kind.INCOME:
+            month['incomes'] += row['total']
+        else:
+            month['expenses'] += row['total']
+            if row['paid']:
+                month['paid_expenses'] += row['total']
+        month['categories'].append({
+            'category': row['category'],
+            'category_name': row['category__name'],
+            'kind': row['kind'],
+            'paid': row['paid'],
+            'total': row['total'],
+            'count': row['count'],
+        })
+    for month in months.values():
+        month['balance'] = month['incomes'] - month['expenses']
+    return {
+        'year': year,
+        'expenses': sum((month['expenses'] for month in months.values()), Decimal('0.00')),
+        'incomes': sum((month['incomes'] for month in months.values()), Decimal('0.00')),
+        'months': list(months.values()),
+    }
+
+
+CASHFLOW_TRUNCATORS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+def bucket_start(value, granularity):
+    if granularity == 'month':
+        return value.replace(day=1)
+    if granularity == 'week':
+        return value - timedelta(days=value.weekday())
+    return value
+
+
+def _as_date(value):
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def _as_decimal(value):
+    return Decimal(str(value or 0)).quantize(Decimal('0.01'))
+
+
+def build_cashflow(user, granularity, date_from, date_to, projected=False, today=None):
+    """
+    Income, expense, net and running balance per bucket in a single query.
+
+    Expense and income rows (and, with ``projected``, the future unpaid
+    occurrences of recurring rows) are bucketed with ``Trunc*`` and combined
+    with ``UNION ALL``. A recurring row's own amount already covers the
+    occurrence on its date, so that one is never projected on top of it.
+    With ``projected``, installment plans are spread over their installments
+    instead of counting the whole amount on the plan's date: each is bucketed
+    by due date, as projected while unpaid and still ahead. A ``SUM(...) OVER
+    (ORDER BY bucket)`` window over the user's whole history up to
+    ``date_to`` gives the running balance, so it already includes everything
+    before ``date_from`` when the outer query trims the range.
+    """
+    today = today or timezone.localdate()
+    trunc = CASHFLOW_TRUNCATORS[granularity]
+
+    def flows(queryset, date_field, **sums):
+        columns = {name: sums.get(name, ZERO) for name in ('income', 'expense', 'projected_income', 'projected_expense')}
+        return (
+            queryset.annotate(bucket=trunc(date_field))
+            .values('bucket')
+            .annotate(**columns)
+            .order_by()
+        )
+
+    expenses = Expense.objects.filter(user=user, date__lte=date_to)
+    incomes = Income.objects.filter(user=user, date__lte=date_to)
+    if projected:
+        # Counted per installment below
+        expenses = expenses.exclude(expense_type=Expense.ExpenseType.INSTALLMENT)
+        incomes = incomes.exclude(income_type=Income.IncomeType.INSTALLMENT)
+    branches = [
+        flows(expenses, 'date', expense=_sum()),
+        flows(incomes, 'date', income=_sum()),
+        # The running balance starts at the beginning of history, archive included
+        flows(ArchivedExpense.objects.filter(user=user, date__lte=date_to), 'date', expense=_sum()),
+        flows(ArchivedIncome.objects.filter(user=user, date__lte=date_to), 'date', income=_sum()),
+    ]
+    if projected:
+        branches.append(flows(
+            Occurrence.objects.filter(
+                user=user,
+                source_type=Expense.ExpenseType.RECURRING,
+                due_date__gt=today,
+                due_date__lte=date_to,
+                paid=False,
+            )
+            .annotate(parent_date=Coalesce('expense__date', 'income__date'))
+            .exclude(due_date=F('parent_date')),
+            'due_date',
+            projected_income=_sum(filter=Q(kind=Occurrence.Kind.INCOME)),
+            projected_expense=_sum(filter=Q(kind=Occurrence.Kind.EXPENSE)),
+        ))
+        ahead = Q(due_date__gt=today, paid=False)
+        branches.append(flows(
+            Occurrence.objects.filter(user=user, source_type=Expense.ExpenseType.INSTALLMENT, due_date__lte=date_to),
+            'due_date',
+            income=_sum(filter=Q(kind=Occurrence.Kind.INCOME) & ~ahead),
+            expense=_sum(filter=Q(kind=Occurrence.Kind.EXPENSE) & ~ahead),
+            projected_income=_sum(filter=Q(kind=Occurrence.Kind.INCOME) & ahead),
+            projected_expense=_sum(filter=Q(kind=Occurrence.Kind.EXPENSE) & ahead),
+        ))
+
+    union = branches[0].union(*branches[1:], all=True)
+    alias = router.db_for_read(Expense)
+    union_sql, params = union.query.get_compiler(alias).as_sql()
+    sql = f"""
+        SELECT bucket, income, expense, projected_income, projected_expense, net, balance
+        FROM (
+            SELECT bucket,
+                   SUM(income) AS income,
+                   SUM(expense) AS expense,
+                   SUM(projected_income) AS projected_income,
+                   SUM(projected_expense) AS projected_expense,
+                   SUM(income + projected_income - expense - projected_expense) AS net,
+                   SUM(SUM(income + projected_income - expense - projected_expense))
+                       OVER (ORDER BY bucket) AS balance
+            FROM ({union_sql}) flows
+            GROUP BY bucket
+        ) series
+        WHERE bucket >= %s
+        ORDER BY bucket
+    """
+    start = bucket_start(date_from, granularity)
+    with connections[alias].cursor() as cursor:
+        cursor.execute(sql, [*params, start.isoformat()])
+        rows = cursor.fetchall()
+
+    return [
+        {
+            'bucket': _as_date(bucket),
+            'income': _as_decimal(income),
+            'expense': _as_decimal(expense),
+            'projected_income': _as_decimal(projected_income),
+            'projected_expense': _as_decimal(projected_expense),
+            'net': _as_decimal(net),
+            'balance': _as_decimal(balance),
+        }
+        for bucket, income, expense, projected_income, projected_expense, net, balance in rows
+    ]
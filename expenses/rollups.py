@@ -0,0 +1,112 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+
+EXPENSE = 'EXPENSE'
+INCOME = 'INCOME'
+
+
+def rollup_key(instance, kind):
+    return (
+        instance.user_id,
+        instance.date.replace(day=1),
+        instance.category_id,
+        kind,
+        bool(getattr(instance, 'paid', False)),
+    )
+
+
+def contributions(instances, kind, sign=1):
+    """Map rollup keys to ``[total, count]`` deltas for the given rows"""
+    deltas = defaultdict(lambda: [Decimal('0.00'), 0])
+    for instance in instances:
+        delta = deltas[rollup_key(instance, kind)]
+        delta[0] += sign * Decimal(instance.amount)
+        delta[1] += sign
+    return deltas
+
+
+def merge(*groups):
+    merged = defaultdict(lambda: [Decimal('0.00'), 0])
+    for deltas in groups:
+        for key, (total, count) in deltas.items():
+            merged[key][0] += total
+            merged[key][1] += count
+    return merged
+
+
+def grouped_contributions(queryset, kind, sign=1, **overrides):
+    """
+    ``contributions`` of every row in ``queryset``, computed with one GROUP BY.
+
+    ``overrides`` replace the ``category`` or ``paid`` part of each key, which
+    gives the contributions the rows will have after an UPDATE setting them.
+    """
+    group_by = ['user', 'month', 'category'] + (['paid'] if kind == EXPENSE else [])
+    grouped = (
+        queryset.annotate(month=TruncMonth('date'))
+        .values(*group_by)
+        .annotate(total=Sum('amount'), count=Count('id'))
+        .order_by()
+    )
+    deltas = merge()
+    for row in grouped:
+        row.update(overrides)
+        delta = deltas[(row['user'], row['month'], row['category'], kind, bool(row.get('paid', False)))]
+        delta[0] += sign * row['total']
+        delta[1] += sign * row['count']
+    return deltas
+
+
+def apply_deltas(deltas):
+    """Add deltas to the rollup rows with one UPDATE per key, creating missing rows"""
+    from .models import MonthlyRollup
+
+    with transaction.atomic():
+        for (user_id, month, category_id, kind, paid), (total, count) in deltas.items():
+            if not total and not count:
+                continue
+            lookup = dict(user_id=user_id, month=month, category_id=category_id, kind=kind, paid=paid)
+            updated = MonthlyRollup.objects.filter(**lookup).update(
+                total=F('total') + total, count=F('count') + count
+            )
+            if updated:
+                continue
+            try:
+                with transaction.atomic():
+                    MonthlyRollup.objects.create(total=total, count=count, **lookup)
+            except IntegrityError:
+                # A concurrent writer created the row first
+                MonthlyRollup.objects.filter(**lookup).update(
+                    total=F('total') + total, count=F('count') + count
+                )
+        MonthlyRollup.objects.filter(count=0).filter(
+            user_id__in={key[0] for key in deltas}
+        ).delete()
+
+
+def rebuild_for_users(user_ids):
+    """Recompute the rollups of some users from the transaction and archive tables"""
+    from .models import ArchivedExpense, ArchivedIncome, Expense, Income, MonthlyRollup
+
+    sources = (
+        (Expense, EXPENSE), (Income, INCOME), (ArchivedExpense, EXPENSE), (ArchivedIncome, INCOME),
+    )
+    totals = merge(*(
+        grouped_contributions(model.objects.filter(user_id__in=user_ids), kind) for model, kind in sources
+    ))
+
+    rows = [
+        MonthlyRollup(
+            user_id=user_id, month=month, category_id=category_id, kind=kind, paid=paid, total=total, count=count,
+        )
+        for (user_id, month, category_id, kind, paid), (total, count) in totals.items()
+    ]
+
+    with transaction.atomic():
+        MonthlyRollup.objects.filter(user_id__in=user_ids).delete()
+        MonthlyRollup.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
@@ -0,0 +1,146 @@
+import logging
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .cache import bump_user_version
+from .models import Expense, Income, SchedulerCheckpoint
+from .occurrences import EXPENSE, INCOME, INSTALLMENT, RECURRING, add_months, step, sync_many_occurrences
+from .rollups import apply_deltas, contributions, merge
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+SOURCES = (
+    (Expense, EXPENSE, 'expense_type'),
+    (Income, INCOME, 'income_type'),
+)
+
+
+def next_recurring_due(row, today):
+    """First due date on or after ``today`` of a recurring row's series"""
+    start = row.next_due_date
+    count = 0
+    due = start
+    while due < today:
+        count += 1
+        due = step(start, row.recurrence_period, count)
+    return due
+
+
+def installment_due(row, number=None):
+    return add_months(row.date, (number or row.current_installment or 1) - 1)
+
+
+def current_installment_on(row, today):
+    """Installment due on or after ``today``, or the last one when the plan is over"""
+    number = row.current_installment or 1
+    while number < row.total_installments and installment_due(row, number) < today:
+        number += 1
+    return number
+
+
+def due_rows(model, type_field, source_type, today):
+    """Rows whose current due date has passed, found through the scheduler's partial indexes"""
+    if source_type == RECURRING:
+        return model.objects.filter(**{type_field: RECURRING}, next_due_date__lt=today)
+    # Candidates only; the due date of the current installment is checked in Python
+    return model.objects.filter(
+        Q(current_installment__lt=F('total_installments')) | Q(current_installment__isnull=True),
+        **{type_field: INSTALLMENT},
+        total_installments__isnull=False,
+        date__lt=today,
+    )
+
+
+def advance(row, source_type, today):
+    """Roll one row forward in memory; return whether anything changed"""
+    if source_type == RECURRING:
+        due = next_recurring_due(row, today)
+        if due == row.next_due_date:
+            return False
+        row.next_due_date = due
+    else:
+        number = current_installment_on(row, today)
+        if number == (row.current_installment or 1):
+            return False
+        row.current_installment = number
+    if hasattr(row, 'paid'):
+        # The new current instance has not been paid yet; the old one keeps
+        # its status in the occurrence history
+        row.paid = False
+        row.paid_date = None
+    return True
+
+
+def advance_source(model, kind, type_field, source_type, today, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Advance every due row of one model and type, for all users, in batches.
+
+    Each batch is one ``bulk_update`` plus the occurrence, rollup and
+    checkpoint writes, committed together. A crash therefore loses at most
+    the current batch, and the next run for the same day resumes after the
+    checkpoint. Re-running is harmless because advanced rows stop matching
+    the due filter.
+    """
+    name = f'{kind.lower()}-{source_type.lower()}'
+    checkpoint, _ = SchedulerCheckpoint.objects.get_or_create(name=name, defaults={'run_date': today})
+    if checkpoint.run_date != today:
+        checkpoint.run_date, checkpoint.last_pk, checkpoint.finished = today, 0, False
+        checkpoint.save()
+    if checkpoint.finished:
+        return 0
+
+    fields = ['next_due_date'] if source_type == RECURRING else ['current_installment']
+    if kind == EXPENSE:
+        fields += ['paid', 'paid_date']
+    fields.append('updated_at')
+
+    advanced = 0
+    queryset = due_rows(model, type_field, source_type, today).order_by('pk')
+    while True:
+        batch = list(queryset.filter(pk__gt=checkpoint.last_pk)[:batch_size])
+        if not batch:
+            break
+        previous = contributions(batch, kind, sign=-1)
+        now = timezone.now()
+        rows = []
+        for row in batch:
+            if advance(row, source_type, today):
+                row.updated_at = now
+                rows.append(row)
+
+        with transaction.atomic():
+            if rows:
+                model.objects.bulk_update(rows, fields, batch_size=batch_size)
+                # Plans whose last installment is already past have nothing left to project
+                upcoming = [row for row in rows if source_type == RECURRING or installment_due(row) >= today]
+                sync_many_occurrences(upcoming, kind, today=today)
+                apply_deltas(merge(previous, contributions(batch, kind)))
+            checkpoint.last_pk = batch[-1].pk
+            checkpoint.save(update_fields=['last_pk', 'updated_at'])
+
+        for user_id in {row.user_id for row in rows}:
+            bump_user_version(user_id)
+        advanced += len(rows)
+
+    checkpoint.finished = True
+    checkpoint.save(update_fields=['finished', 'updated_at'])
+    logger.info("Scheduler advanced %d %s rows for %s", advanced, name, today)
+    return advanced
+
+
+def run_scheduler(today=None, batch_size=DEFAULT_BATCH_SIZE, force=False):
+    """Advance due recurring and installment rows of every user; return counts per source"""
+    today = today or timezone.localdate()
+    if force:
+        SchedulerCheckpoint.objects.filter(run_date=today).update(finished=False, last_pk=0)
+    results = {}
+    for model, kind, type_field in SOURCES:
+        for source_type in (RECURRING, INSTALLMENT):
+            results[f'{kind.lower()}-{source_type.lower()}'] = advance_source(
+                model, kind, type_field, source_type, today, batch_size
+            )
+    return results
@@ -0,0 +1,52 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db import connections
+from django.db.models import F, FloatField, Q, Value
+
+from .models import ArchivedExpense, ArchivedIncome, Expense, Income
+
+# Text search configuration; the search_vector trigger (migration 0013) uses the same one
+SEARCH_CONFIG = 'portuguese'
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+SEARCH_FIELDS = ['id', 'date', 'description', 'amount', 'category', 'category__name']
+
+
+def rank_matches(queryset, q):
+    """
+    Rows of ``queryset`` whose description matches ``q``, best match first.
+
+    On PostgreSQL a row matches when its stored ``search_vector`` matches the
+    query (stemmed words, ``"phrases"``, ``-exclusions``) or when ``q`` is
+    word-similar to the description, which catches typos; both conditions
+    are served by GIN indexes. The rank adds the full-text rank to the
+    trigram similarity. Other databases fall back to a substring match on
+    every word, newest first, without a rank.
+    """
+    if connections[queryset.db].vendor != 'postgresql':
+        for term in q.split():
+            queryset = queryset.filter(description__icontains=term)
+        return queryset.annotate(rank=Value(None, output_field=FloatField())).order_by('-date', '-id')
+
+    query = SearchQuery(q, config=SEARCH_CONFIG, search_type='websearch')
+    return (
+        queryset
+        .filter(Q(search_vector=query) | Q(description__trigram_word_similar=q))
+        .annotate(rank=SearchRank(F('search_vector'), query) + TrigramWordSimilarity(q, 'description'))
+        .order_by('-rank', '-date', '-id')
+    )
+
+
+def search_transactions(user, q, limit=DEFAULT_LIMIT):
+    """The user's best ``limit`` expenses and incomes for ``q``, archived ones included, merged by rank"""
+    results = []
+    sources = (('expense', Expense), ('expense', ArchivedExpense), ('income', Income), ('income', ArchivedIncome))
+    for kind, model in sources:
+        rows = rank_matches(model.objects.filter(user=user), q).values(*SEARCH_FIELDS, 'rank')[:limit]
+        for row in rows:
+            row['category_name'] = row.pop('category__name')
+            row['rank'] = None if row['rank'] is None else round(row['rank'], 4)
+            results.append({'kind': kind, **row})
+    results.sort(key=lambda row: (row['rank'] or 0, row['date'], row['id']), reverse=True)
+    return results[:limit]
@@ -1,12 +1,74 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models import Expense, Category, Income
 
+BULK_MAX_ITEMS = getattr(settings, 'BULK_MAX_ITEMS', 1000)
+
+class SparseFieldsetMixin:
+    """Limit read responses to the comma-separated ``fields`` query parameter"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+        requested = request.query_params.get('fields')
+        if not requested:
+            return
+        allowed = {name.strip() for name in requested.split(',') if name.strip()}
+        for name in set(self.fields) - allowed:
+            self.fields.pop(name)
+
+def compact_requested(request):
+    return (
+        request is not None
+        and request.method == 'GET'
+        and request.query_params.get('compact', '').lower() in ('true', '1', 'yes')
+    )
+
+class CompactLabelsMixin:
+    """
+    ``?compact=true`` drops the per-row display labels.
+
+    ``label_fields`` maps each label field to the field it describes; the
+    list view then sends the labels once, as the ``label_table`` of the page.
+    """
+    label_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if compact_requested(self.context.get('request')):
+            for name in self.label_fields:
+                self.fields.pop(name, None)
+
+    @classmethod
+    def label_table(cls, instances):
+        """``{field: {value: label}}``: every choice, and the related rows present in ``instances``"""
+        model = cls.Meta.model
+        table = {}
+        for field_name in cls.label_fields.values():
+            field = model._meta.get_field(field_name)
+            if field.is_relation:
+                table[field_name] = {
+                    getattr(instance, field.attname): str(getattr(instance, field_name))
+                    for instance in instances
+                    if getattr(instance, field.attname) is not None
+                }
+            else:
+                table[field_name] = {value: str(label) for value, label in field.choices}
+        return table
+
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ['id', 'name', 'description', 'icon', 'color']
 
-class ExpenseSerializer(serializers.ModelSerializer):
+class ExpenseSerializer(CompactLabelsMixin, SparseFieldsetMixin, serializers.ModelSerializer):
+    label_fields = {
+        'category_name': 'category',
+        'expense_type_display': 'expense_type',
+        'recurrence_period_display': 'recurrence_period',
+    }
     category_name = serializers.CharField(source='category.name', read_only=True)
     expense_type_display = serializers.CharField(source='get_expense_type_display', read_only=True)
     recurrence_period_display = serializers.CharField(source='get_recurrence_period_display', read_only=True)
@@ -48,7 +110,12 @@ class ExpenseSerializer(serializers.ModelSerializer):
         
         return data
 
-class IncomeSerializer(serializers.ModelSerializer):
+class IncomeSerializer(CompactLabelsMixin, SparseFieldsetMixin, serializers.ModelSerializer):
+    label_fields = {
+        'category_name': 'category',
+        'income_type_display': 'income_type',
+        'recurrence_period_display': 'recurrence_period',
+    }
     category_name = serializers.CharField(source='category.name', read_only=True)
     income_type_display = serializers.CharField(source='get_income_type_display', read_only=True)
     recurrence_period_display = serializers.CharField(source='get_recurrence_period_display', read_only=True)
@@ -88,4 +155,13 @@ class IncomeSerializer(serializers.ModelSerializer):
                 )
             data['current_installment'] = data.get('current_installment', 1)
         
-        return data
\ No newline at end of file
+        return data
+
+class BulkIdsSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=BULK_MAX_ITEMS
+    )
+
+class MarkPaidSerializer(BulkIdsSerializer):
+    paid = serializers.BooleanField(default=True)
+    paid_date = serializers.DateField(required=False, allow_null=True)
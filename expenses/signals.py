@@ -0,0 +1,115 @@
+from django.contrib.auth.models import User
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import revoke_user_tokens
+from .cache import bump_global_version, bump_user_version
+from .metrics import install_query_recorder
+from .models import Category, Expense, Income, Tombstone
+from .occurrences import EXPENSE, INCOME, sync_occurrences
+from .rollups import apply_deltas, contributions, merge, rebuild_for_users
+
+
+connection_created.connect(install_query_recorder, dispatch_uid='expenses_query_recorder')
+
+
+@receiver(post_save, sender=Expense)
+def update_expense_occurrences(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sync_occurrences(instance, EXPENSE)
+
+
+@receiver(post_save, sender=Income)
+def update_income_occurrences(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sync_occurrences(instance, INCOME)
+
+
+@receiver(post_delete, sender=Token)
+def evict_deleted_token(sender, instance, **kwargs):
+    revoke_user_tokens(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def evict_user_tokens(sender, instance, **kwargs):
+    revoke_user_tokens(instance.pk)
+
+
+@receiver(post_save, sender=Expense)
+@receiver(post_delete, sender=Expense)
+@receiver(post_save, sender=Income)
+@receiver(post_delete, sender=Income)
+def bump_owner_data_version(sender, instance, **kwargs):
+    bump_user_version(instance.user_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_category_data_version(sender, instance, **kwargs):
+    bump_global_version()
+
+
+@receiver(post_delete, sender=Expense)
+def record_expense_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(owner_id=instance.user_id, kind=Tombstone.Kind.EXPENSE, object_id=instance.pk)
+
+
+@receiver(post_delete, sender=Income)
+def record_income_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(owner_id=instance.user_id, kind=Tombstone.Kind.INCOME, object_id=instance.pk)
+
+
+@receiver(post_delete, sender=Category)
+def record_category_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(owner_id=None, kind=Tombstone.Kind.CATEGORY, object_id=instance.pk)
+
+
+ROLLUP_KINDS = {Expense: EXPENSE, Income: INCOME}
+
+
+@receiver(pre_save, sender=Expense)
+@receiver(pre_save, sender=Income)
+def remember_rollup_previous(sender, instance, raw=False, **kwargs):
+    instance._rollup_previous = None
+    if not raw and instance.pk:
+        instance._rollup_previous = sender.objects.filter(pk=instance.pk).only(
+            'user_id', 'date', 'category_id', 'amount', *(['paid'] if sender is Expense else [])
+        ).first()
+
+
+@receiver(post_save, sender=Expense)
+@receiver(post_save, sender=Income)
+def update_rollups_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    kind = ROLLUP_KINDS[sender]
+    previous = getattr(instance, '_rollup_previous', None)
+    apply_deltas(merge(
+        contributions([previous] if previous else [], kind, sign=-1),
+        contributions([instance], kind),
+    ))
+
+
+@receiver(post_delete, sender=Expense)
+@receiver(post_delete, sender=Income)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    apply_deltas(contributions([instance], ROLLUP_KINDS[sender], sign=-1))
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_rollup_users(sender, instance, **kwargs):
+    instance._rollup_users = list(
+        instance.monthlyrollup_set.values_list('user_id', flat=True).distinct()
+    )
+
+
+@receiver(post_delete, sender=Category)
+def rebuild_category_rollups(sender, instance, **kwargs):
+    # Rows of a deleted category were moved to "no category" by SET_NULL
+    # without signals, so recompute the affected users from scratch.
+    users = getattr(instance, '_rollup_users', [])
+    if users:
+        rebuild_for_users(users)
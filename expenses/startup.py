@@ -0,0 +1,95 @@
+import logging
+import time
+from contextlib import contextmanager
+
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, OperationalError, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+# pg_advisory_lock key shared by every replica applying migrations
+MIGRATION_LOCK_KEY = 7_452_019
+
+_migrations_applied = False
+
+
+def wait_for_database(alias=DEFAULT_DB_ALIAS, timeout=60, interval=0.5):
+    """Block until the database accepts connections, for at most ``timeout`` seconds"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            connections[alias].ensure_connection()
+            return
+        except OperationalError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(interval)
+
+
+def pending_migrations(alias=DEFAULT_DB_ALIAS):
+    """Migrations not yet recorded in ``django_migrations``: one query plus reading the migration files"""
+    executor = MigrationExecutor(connections[alias])
+    return executor.migration_plan(executor.loader.graph.leaf_nodes())
+
+
+@contextmanager
+def migration_lock(alias=DEFAULT_DB_ALIAS):
+    """Session-level advisory lock on PostgreSQL, so one replica migrates while the others wait"""
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_lock(%s)', [MIGRATION_LOCK_KEY])
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_unlock(%s)', [MIGRATION_LOCK_KEY])
+
+
+def apply_pending_migrations(alias=DEFAULT_DB_ALIAS, verbosity=1):
+    """
+    Apply unapplied migrations and return how many there were.
+
+    The common case, nothing pending, costs one query and takes no lock.
+    Otherwise the plan is recomputed under ``migration_lock``: replicas that
+    waited for the lock usually find the work already done.
+    """
+    if not pending_migrations(alias):
+        return 0
+    with migration_lock(alias):
+        plan = pending_migrations(alias)
+        if plan:
+            logger.info("Applying %d migrations", len(plan))
+            call_command('migrate', database=alias, interactive=False, verbosity=verbosity)
+    return len(plan)
+
+
+def warm_up():
+    """
+    Do the work the first request would otherwise pay for, without touching the database.
+
+    Importing the URLconf pulls in every view, serializer and renderer. Run it
+    in the gunicorn master (``preload_app``), so forked workers start warm.
+    """
+    get_resolver().url_patterns
+
+
+def readiness_problems(alias=DEFAULT_DB_ALIAS):
+    """Why this process shouldn't receive traffic yet; empty when it's ready"""
+    global _migrations_applied
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+        if not _migrations_applied:
+            # Once applied they stay applied; later probes only ping the database
+            _migrations_applied = not pending_migrations(alias)
+    except DatabaseError as e:
+        logger.warning("Readiness check failed: %s", e)
+        return ['database unavailable']
+    if not _migrations_applied:
+        return ['migrations pending']
+    return []
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import ArchivedExpense, ArchivedIncome, Category, Expense, Income, Tombstone
+from .serializers import CategorySerializer, ExpenseSerializer, IncomeSerializer
+
+DELETED_KEYS = {
+    Tombstone.Kind.EXPENSE: 'expenses',
+    Tombstone.Kind.INCOME: 'incomes',
+    Tombstone.Kind.CATEGORY: 'categories',
+}
+
+
+def safety_window():
+    return timedelta(seconds=getattr(settings, 'SYNC_SAFETY_SECONDS', 5))
+
+
+def commit_horizon(alias):
+    """
+    A time before which every row stamp is visible to this connection.
+
+    Rows are stamped with ``updated_at`` (or ``deleted_at``) by the app just
+    before they're written, but become visible only when their transaction
+    commits. On PostgreSQL the horizon is therefore the start of the oldest
+    other transaction that has written and not finished, capped by this
+    transaction's own start, which precedes its snapshot. Elsewhere it's
+    simply now.
+    """
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return timezone.now()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT least(now(), min(xact_start)) FROM pg_stat_activity "
+            "WHERE datname = current_database() AND backend_xid IS NOT NULL AND pid <> pg_backend_pid()"
+        )
+        return cursor.fetchone()[0]
+
+
+def tombstone_retention():
+    return timedelta(days=getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', 90))
+
+
+def encode_cursor(moment):
+    return str(int(moment.timestamp() * 1_000_000))
+
+
+def decode_cursor(cursor):
+    try:
+        return datetime.fromtimestamp(int(cursor) / 1_000_000, tz=dt_timezone.utc)
+    except (TypeError, ValueError, OverflowError, OSError):
+        raise ValidationError({'since': 'Cursor inválido.'})
+
+
+def build_changes(request, since=None):
+    """
+    Rows created or changed after ``since`` plus the ids deleted since then.
+
+    Row stamps come from the app clock, not commit order, so the returned
+    cursor is the ``commit_horizon``, read before any row, minus
+    ``SYNC_SAFETY_SECONDS``. On PostgreSQL that covers every transaction
+    still in flight however long it runs; the window only has to absorb the
+    gap between stamping a row and writing it plus clock skew between app
+    servers and the database. On other databases the window alone covers
+    in-flight transactions, so one that commits later than that after
+    stamping can be missed. Clients upsert by id and rows seen twice are
+    harmless. A cursor older than the tombstone retention (or no cursor)
+    yields a full snapshot with ``reset`` set, telling the client to drop
+    its local copy.
+    """
+    now = timezone.now()
+    horizon = commit_horizon(router.db_for_read(Expense))
+    reset = since is None or since < now - tombstone_retention()
+    user = request.user
+    context = {'request': request}
+
+    expenses = Expense.objects.filter(user=user).select_related('category')
+    incomes = Income.objects.filter(user=user).select_related('category')
+    categories = Category.objects.all()
+    deleted = {'expenses': [], 'incomes': [], 'categories': []}
+
+    if not reset:
+        expenses = expenses.filter(updated_at__gt=since)
+        incomes = incomes.filter(updated_at__gt=since)
+        categories = categories.filter(updated_at__gt=since)
+        tombstones = Tombstone.objects.filter(
+            Q(owner_id=user.pk) | Q(owner_id__isnull=True), deleted_at__gt=since
+        ).values_list('kind', 'object_id')
+        for kind, object_id in tombstones:
+            deleted[DELETED_KEYS[kind]].append(object_id)
+
+    expenses = list(expenses.order_by('updated_at'))
+    incomes = list(incomes.order_by('updated_at'))
+    if reset:
+        # Archived rows never change, so only a full snapshot has to carry them
+        expenses = [*ArchivedExpense.objects.filter(user=user).select_related('category'), *expenses]
+        incomes = [*ArchivedIncome.objects.filter(user=user).select_related('category'), *incomes]
+
+    return {
+        'cursor': encode_cursor(min(horizon, now) - safety_window()),
+        'reset': reset,
+        'expenses': ExpenseSerializer(expenses, many=True, context=context).data,
+        'incomes': IncomeSerializer(incomes, many=True, context=context).data,
+        'categories': CategorySerializer(categories.order_by('updated_at'), many=True, context=context).data,
+        'deleted': deleted,
+    }
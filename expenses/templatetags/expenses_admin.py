@@ -0,0 +1,25 @@
+from hashlib import sha256
+
+from django import template
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+from django.utils.translation import get_language
+
+from ..cache import get_cache
+
+register = template.Library()
+
+# The buckets come from distinct-date queries over the filtered changelist
+DATE_HIERARCHY_CACHE_SECONDS = 600
+
+
+@register.inclusion_tag('admin/date_hierarchy.html')
+def cached_date_hierarchy(cl):
+    """``{% date_hierarchy cl %}`` with its links cached per model, language and query string"""
+    digest = sha256(f'{cl.model._meta.label}|{get_language()}|{cl.get_query_string()}'.encode()).hexdigest()
+    key = f'expenses:admin-dates:{digest}'
+    cache = get_cache()
+    context = cache.get(key)
+    if context is None:
+        context = date_hierarchy(cl) or {}
+        cache.set(key, context, DATE_HIERARCHY_CACHE_SECONDS)
+    return context
@@ -1,12 +1,41 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ExpenseViewSet, CategoryViewSet, IncomeViewSet
+from .batch import BatchView
+from .views import (
+    ExpenseViewSet, CategoryViewSet, IncomeViewSet, SummaryView, ForecastView, LoginView, LogoutView,
+    StatementImportView, SyncView, MonthlyReportView,
+    CashflowView, SearchView,
+)
 
 router = DefaultRouter()
 router.register(r'expenses', ExpenseViewSet, basename='expense')
 router.register(r'categories', CategoryViewSet, basename='category')
 router.register(r'incomes', IncomeViewSet, basename='income')
 
-urlpatterns = [
+urlpatterns = []
+
+if settings.SERVER_MODE == 'asgi':
+    # Async GET handlers ahead of the sync routes; other methods fall through to the DRF views
+    from . import async_views
+
+    urlpatterns += [
+        path('summary/', async_views.summary, name='summary-async'),
+        path('expenses/', async_views.expense_list, name='expense-list-async'),
+        path('incomes/', async_views.income_list, name='income-list-async'),
+        path('categories/', async_views.category_list, name='category-list-async'),
+    ]
+
+urlpatterns += [
+    path('auth/token/', LoginView.as_view(), name='auth-token'),
+    path('auth/logout/', LogoutView.as_view(), name='auth-logout'),
+    path('summary/', SummaryView.as_view(), name='summary'),
+    path('forecast/', ForecastView.as_view(), name='forecast'),
+    path('import/', StatementImportView.as_view(), name='statement-import'),
+    path('sync/', SyncView.as_view(), name='sync'),
+    path('reports/monthly/', MonthlyReportView.as_view(), name='monthly-report'),
+    path('cashflow/', CashflowView.as_view(), name='cashflow'),
+    path('search/', SearchView.as_view(), name='search'),
+    path('batch/', BatchView.as_view(), name='batch'),
     path('', include(router.urls)),
-]
\ No newline at end of file
+]
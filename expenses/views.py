@@ -1,28 +1,51 @@
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render
-from rest_framework import viewsets, status, authentication
+from rest_framework import viewsets, status
+from rest_framework.authtoken.models import Token
+from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.views import APIView
+from rest_framework.exceptions import APIException
+from rest_framework.parsers import MultiPartParser
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.utils import timezone
 from .models import Expense, Category, Income
-from .serializers import ExpenseSerializer, CategorySerializer, IncomeSerializer
+from .serializers import ExpenseSerializer, CategorySerializer, IncomeSerializer, compact_requested
+from .reports import CASHFLOW_TRUNCATORS, build_cashflow, build_forecast, build_monthly_report, build_summary
+from .occurrences import EXPENSE, INCOME, add_months, default_until, horizon_months
+from .archive import ArchiveReadMixin
+from .bulk import BulkMarkPaidMixin, BulkWriteMixin
+from .db_routers import ReplicaRoutingMixin
+from .importers import StatementError, import_statement
+from .exports import ExportMixin
+from .cache import GLOBAL_SCOPE, cached_response
+from .search import DEFAULT_LIMIT, MAX_LIMIT, search_transactions
+from .sync import build_changes, decode_cursor
+from .filters import TransactionFilterBackend, parse_bool_param, parse_date_param
+from .pagination import DateKeysetPagination
+from .metrics import render_prometheus, timed_serialization
+from .startup import readiness_problems
 import logging
 
 logger = logging.getLogger(__name__)
 
-class CategoryViewSet(viewsets.ModelViewSet):
-    authentication_classes = [authentication.BasicAuthentication]
+class CategoryViewSet(ReplicaRoutingMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = CategorySerializer
+    # Categories are shared: everyone reads them from the primary right after a change
+    pin_scopes = (GLOBAL_SCOPE,)
 
     def get_queryset(self):
-        logger.info(f"User {self.request.user} requesting categories")
+        logger.debug("User %s requesting categories", self.request.user.pk)
         return Category.objects.all()
 
+    @cached_response(GLOBAL_SCOPE)
     def list(self, request, *args, **kwargs):
         try:
-            logger.info(f"Auth attempt for categories - User: {request.user}, Auth: {request.auth}")
-            
             if not request.user.is_authenticated:
                 logger.warning("User is not authenticated")
                 return Response(
@@ -31,29 +54,39 @@ class CategoryViewSet(viewsets.ModelViewSet):
                 )
             
             queryset = self.get_queryset()
-            serializer = self.get_serializer(queryset, many=True)
-            logger.info(f"Successfully returning {len(serializer.data)} categories")
-            return Response(serializer.data)
+            with timed_serialization():
+                data = self.get_serializer(queryset, many=True).data
+            logger.info("Returning %d categories", len(data))
+            return Response(data)
         except Exception as e:
-            logger.error(f"Error in categories list view: {str(e)}", exc_info=True)
+            logger.error("Error in categories list view: %s", e, exc_info=True)
             return Response(
                 {"error": "Error fetching categories"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-class ExpenseViewSet(viewsets.ModelViewSet):
-    authentication_classes = [authentication.BasicAuthentication]
+class ExpenseViewSet(
+    ReplicaRoutingMixin, ArchiveReadMixin, BulkWriteMixin, BulkMarkPaidMixin, ExportMixin, viewsets.ModelViewSet
+):
     permission_classes = [IsAuthenticated]
     serializer_class = ExpenseSerializer
+    filter_backends = [TransactionFilterBackend]
+    pagination_class = DateKeysetPagination
+    type_field = 'expense_type'
+    occurrence_kind = EXPENSE
+    export_fields = [
+        'id', 'date', 'description', 'amount', 'category', 'category__name', 'expense_type',
+        'recurrence_period', 'next_due_date', 'total_installments', 'current_installment',
+        'installment_value', 'paid', 'paid_date', 'created_at', 'updated_at',
+    ]
 
     def get_queryset(self):
-        logger.info(f"User {self.request.user} requesting expenses")
-        return Expense.objects.filter(user=self.request.user).order_by('-date')
+        logger.debug("User %s requesting expenses", self.request.user.pk)
+        return Expense.objects.filter(user=self.request.user).select_related('category').order_by('-date', '-id')
 
+    @cached_response()
     def list(self, request, *args, **kwargs):
         try:
-            logger.info(f"Auth attempt for expenses - User: {request.user}, Auth: {request.auth}")
-            
             if not request.user.is_authenticated:
                 logger.warning("User is not authenticated")
                 return Response(
@@ -61,34 +94,66 @@ class ExpenseViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_401_UNAUTHORIZED
                 )
             
-            queryset = self.get_queryset()
-            serializer = self.get_serializer(queryset, many=True)
-            logger.info(f"Successfully returning {len(serializer.data)} expenses")
-            return Response(serializer.data)
+            queryset = self.filter_queryset(self.get_queryset())
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                with timed_serialization():
+                    data = self.get_serializer(page, many=True).data
+                logger.info("Returning page of %d expenses for user %s", len(data), request.user.pk)
+                response = self.get_paginated_response(data)
+                if compact_requested(request):
+                    response.data['labels'] = self.get_serializer_class().label_table(page)
+                return response
+
+            rows = self.with_archived(queryset)
+            with timed_serialization():
+                data = self.get_serializer(rows, many=True).data
+            logger.info("Returning %d expenses for user %s", len(data), request.user.pk)
+            if compact_requested(request):
+                return Response({'labels': self.get_serializer_class().label_table(rows), 'results': data})
+            return Response(data)
+        except APIException:
+            raise
         except Exception as e:
-            logger.error(f"Error in expenses list view: {str(e)}", exc_info=True)
+            logger.error("Error in expenses list view: %s", e, exc_info=True)
             return Response(
                 {"error": "Error fetching expenses"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
     def perform_create(self, serializer):
-        logger.info(f"Creating expense for user {self.request.user}")
-        serializer.save(user=self.request.user)
+        logger.info("Creating expense for user %s", self.request.user.pk)
+        with transaction.atomic():
+            serializer.save(user=self.request.user)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            serializer.save()
 
-class IncomeViewSet(viewsets.ModelViewSet):
-    authentication_classes = [authentication.BasicAuthentication]
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+
+class IncomeViewSet(ReplicaRoutingMixin, ArchiveReadMixin, BulkWriteMixin, ExportMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = IncomeSerializer
+    filter_backends = [TransactionFilterBackend]
+    pagination_class = DateKeysetPagination
+    type_field = 'income_type'
+    occurrence_kind = INCOME
+    export_fields = [
+        'id', 'date', 'description', 'amount', 'category', 'category__name', 'income_type',
+        'recurrence_period', 'next_due_date', 'total_installments', 'current_installment',
+        'installment_value', 'created_at', 'updated_at',
+    ]
 
     def get_queryset(self):
-        logger.info(f"User {self.request.user} requesting incomes")
-        return Income.objects.filter(user=self.request.user).order_by('-date')
+        logger.debug("User %s requesting incomes", self.request.user.pk)
+        return Income.objects.filter(user=self.request.user).select_related('category').order_by('-date', '-id')
 
+    @cached_response()
     def list(self, request, *args, **kwargs):
         try:
-            logger.info(f"Auth attempt for incomes - User: {request.user}, Auth: {request.auth}")
-            
             if not request.user.is_authenticated:
                 logger.warning("User is not authenticated")
                 return Response(
@@ -96,17 +161,222 @@ class IncomeViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_401_UNAUTHORIZED
                 )
             
-            queryset = self.get_queryset()
-            serializer = self.get_serializer(queryset, many=True)
-            logger.info(f"Successfully returning {len(serializer.data)} incomes")
-            return Response(serializer.data)
+            queryset = self.filter_queryset(self.get_queryset())
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                with timed_serialization():
+                    data = self.get_serializer(page, many=True).data
+                logger.info("Returning page of %d incomes for user %s", len(data), request.user.pk)
+                response = self.get_paginated_response(data)
+                if compact_requested(request):
+                    response.data['labels'] = self.get_serializer_class().label_table(page)
+                return response
+
+            rows = self.with_archived(queryset)
+            with timed_serialization():
+                data = self.get_serializer(rows, many=True).data
+            logger.info("Returning %d incomes for user %s", len(data), request.user.pk)
+            if compact_requested(request):
+                return Response({'labels': self.get_serializer_class().label_table(rows), 'results': data})
+            return Response(data)
+        except APIException:
+            raise
         except Exception as e:
-            logger.error(f"Error in incomes list view: {str(e)}", exc_info=True)
+            logger.error("Error in incomes list view: %s", e, exc_info=True)
             return Response(
                 {"error": "Error fetching incomes"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
     def perform_create(self, serializer):
-        logger.info(f"Creating income for user {self.request.user}")
-        serializer.save(user=self.request.user)
+        logger.info("Creating income for user %s", self.request.user.pk)
+        with transaction.atomic():
+            serializer.save(user=self.request.user)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            serializer.save()
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+
+
+class SummaryView(ReplicaRoutingMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
+    @cached_response()
+    def get(self, request, *args, **kwargs):
+        try:
+            logger.info("User %s requesting summary", request.user.pk)
+            return Response(build_summary(request.user))
+        except Exception as e:
+            logger.error("Error in summary view: %s", e, exc_info=True)
+            return Response(
+                {"error": "Error fetching summary"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class ForecastView(ReplicaRoutingMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
+    @cached_response()
+    def get(self, request, *args, **kwargs):
+        try:
+            months = int(request.query_params.get('months', 3))
+        except ValueError:
+            months = 0
+        if not 1 <= months <= horizon_months():
+            return Response(
+                {"months": f"Informe um número de meses entre 1 e {horizon_months()}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            logger.info("User %s requesting %d month forecast", request.user.pk, months)
+            return Response(build_forecast(request.user, months))
+        except Exception as e:
+            logger.error("Error in forecast view: %s", e, exc_info=True)
+            return Response(
+                {"error": "Error fetching forecast"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class LoginView(ObtainAuthToken):
+    """Exchange a username and password for an API token, hashing the password only here"""
+    authentication_classes = []
+    permission_classes = []
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data['user']
+        token, created = Token.objects.get_or_create(user=user)
+        logger.info("Issued API token for user %s", user.pk)
+        return Response({'token': token.key, 'user_id': user.pk, 'username': user.get_username()})
+
+
+class LogoutView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        if isinstance(request.auth, Token):
+            request.auth.delete()
+            logger.info("Revoked API token for user %s", request.user.pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class StatementImportView(ReplicaRoutingMixin, APIView):
+    """Upload a CSV or OFX statement; rows are parsed and inserted as a stream"""
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"file": "Envie o arquivo do extrato."}, status=status.HTTP_400_BAD_REQUEST)
+
+        file_format = (request.data.get('format') or upload.name.rsplit('.', 1)[-1]).lower()
+        encoding = request.data.get('encoding') or 'utf-8'
+        try:
+            logger.info("User %s importing %s statement %s", request.user.pk, file_format, upload.name)
+            stats = import_statement(request.user, upload, file_format, encoding=encoding)
+        except (StatementError, LookupError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(stats, status=status.HTTP_201_CREATED)
+
+
+class SyncView(APIView):
+    """Incremental sync: rows changed and ids deleted since the ``since`` cursor"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        since = request.query_params.get('since')
+        since = decode_cursor(since) if since else None
+        logger.info("User %s syncing since %s", request.user.pk, since)
+        return Response(build_changes(request, since))
+
+
+class SearchView(ReplicaRoutingMixin, APIView):
+    """Ranked full-text and fuzzy search over the user's expense and income descriptions"""
+    permission_classes = [IsAuthenticated]
+
+    @cached_response()
+    def get(self, request, *args, **kwargs):
+        q = request.query_params.get('q', '').strip()
+        if len(q) < 2:
+            return Response({"q": "Informe ao menos 2 caracteres para a busca."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.query_params.get('limit', DEFAULT_LIMIT))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= MAX_LIMIT:
+            return Response(
+                {"limit": f"Informe um limite entre 1 e {MAX_LIMIT}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        logger.info("User %s searching transactions", request.user.pk)
+        return Response({'query': q, 'results': search_transactions(request.user, q, limit)})
+
+
+class MonthlyReportView(ReplicaRoutingMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
+    @cached_response()
+    def get(self, request, *args, **kwargs):
+        try:
+            year = int(request.query_params.get('year', timezone.localdate().year))
+        except ValueError:
+            return Response({"year": "Ano inválido."}, status=status.HTTP_400_BAD_REQUEST)
+        logger.info("User %s requesting monthly report for %s", request.user.pk, year)
+        return Response(build_monthly_report(request.user, year))
+
+
+class CashflowView(ReplicaRoutingMixin, APIView):
+    """Income, expense, net and running balance per day, week or month"""
+    permission_classes = [IsAuthenticated]
+
+    @cached_response()
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        granularity = params.get('granularity', 'month')
+        if granularity not in CASHFLOW_TRUNCATORS:
+            return Response(
+                {"granularity": f"Use {', '.join(CASHFLOW_TRUNCATORS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        projected = bool(parse_bool_param(params, 'projected'))
+        today = timezone.localdate()
+        date_to = parse_date_param(params, 'to') or (default_until(today) if projected else today)
+        date_from = parse_date_param(params, 'from') or add_months(today.replace(day=1), -11)
+        if date_from > date_to:
+            return Response({"from": "A data inicial deve ser anterior à final."}, status=status.HTTP_400_BAD_REQUEST)
+
+        logger.info(
+            "User %s requesting %s cashflow from %s to %s", request.user.pk, granularity, date_from, date_to
+        )
+        return Response(build_cashflow(request.user, granularity, date_from, date_to, projected=projected, today=today))
+
+
+def metrics(request):
+    """Prometheus text exposition of this process's request histograms"""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponse(status=401)
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def healthz(request):
+    """Liveness: the process answers requests; never touches the database"""
+    return JsonResponse({"status": "ok"})
+
+
+def readyz(request):
+    """Readiness: the database answers and every migration is applied"""
+    problems = readiness_problems()
+    if problems:
+        return JsonResponse({"status": "unavailable", "problems": problems}, status=503)
+    return JsonResponse({"status": "ok"})
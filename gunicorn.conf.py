@@ -0,0 +1,84 @@
+"""
+Gunicorn settings, picked up automatically from the working directory.
+
+``SERVER_MODE=wsgi`` (default) serves ``contas_backend.wsgi`` with threaded
+sync workers; ``SERVER_MODE=asgi`` serves ``contas_backend.asgi`` with
+uvicorn workers. There the middleware chain and the hot read endpoints are
+async, but the ORM is not: their queries and serialization run on a pool of
+``ASYNC_QUERY_THREADS`` threads per worker, so a slow query holds a pool
+thread rather than the event loop, and independent queries overlap.
+
+Worker counts follow the CPUs actually available to the container. The
+response and token caches default to local memory, which is per process,
+so without a shared ``CACHE_BACKEND`` everything runs in a single process
+and scales with threads (sync) or the event loop (async) instead.
+``WEB_CONCURRENCY`` always overrides the computed worker count.
+
+The app is loaded and warmed up once in the master (``preload_app``), so
+workers fork ready to serve; ``when_ready`` logs the time since the
+container started against ``COLD_START_BUDGET_SECONDS``.
+"""
+import multiprocessing
+import os
+import time
+
+
+def available_cpus():
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = multiprocessing.cpu_count()
+    # Honour a cgroup v2 CPU quota (docker --cpus)
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+cpus = available_cpus()
+server_mode = os.environ.get('SERVER_MODE', 'wsgi')
+shared_cache = bool(os.environ.get('CACHE_BACKEND'))
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+if server_mode == 'asgi':
+    wsgi_app = 'contas_backend.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+    # One event loop per core; concurrency within a worker comes from async I/O
+    workers = cpus if shared_cache else 1
+else:
+    wsgi_app = 'contas_backend.wsgi:application'
+    worker_class = 'gthread'
+    workers = 2 * cpus + 1 if shared_cache else 1
+    threads = int(os.environ.get('GUNICORN_THREADS', 4 if shared_cache else 2 * cpus + 1))
+
+workers = int(os.environ.get('WEB_CONCURRENCY', workers))
+
+preload_app = True
+# Exported by backend/entrypoint.sh; otherwise count from gunicorn's own start
+started_at = float(os.environ.get('CONTAINER_STARTED_AT') or time.time())
+
+
+def when_ready(server):
+    """Runs in the master after the app is loaded and before workers fork"""
+    from django.conf import settings
+    from django.db import connections
+
+    from expenses.startup import warm_up
+
+    warm_up()
+    # Workers must open their own connections, never inherit the master's
+    connections.close_all()
+
+    elapsed = time.time() - started_at
+    budget = settings.COLD_START_BUDGET_SECONDS
+    log = server.log.warning if elapsed > budget else server.log.info
+    log('Cold start took %.2fs (budget %.1fs)', elapsed, budget)